@@ -0,0 +1,132 @@
+"""
+Load-test POST /api/courses/generate/ end to end without the real Gemini API.
+
+Requests go through the full view -> job queue -> AIService -> HTTP path
+against an in-process Gemini stub (see ai_integration.stub_server), using a
+throwaway SQLite database:
+
+    cd backend/app_backend
+    python -m ai_integration.benchmarks.bench_generation --courses 20 --latency 0.5
+    python -m ai_integration.benchmarks.bench_generation --error-rate 0.1 --truncate-rate 0.1
+
+With --record DIR the stub's responses are saved; --replay DIR then serves
+them back with no network at all, which makes runs exactly repeatable.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=10, help="Distinct courses requested.")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent HTTP clients.")
+    parser.add_argument("--workers", type=int, default=2, help="COURSE_GENERATION_WORKERS.")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--topics", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=600.0, help="Give up waiting after this many seconds.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="DIR", help="Save every stub response to DIR.")
+    mode.add_argument("--replay", metavar="DIR", help="Serve responses from DIR instead of the stub.")
+    args = parser.parse_args()
+
+    from ai_integration.stub_server import GeminiStubServer, StubConfig
+
+    server = None
+    if not args.replay:
+        server = GeminiStubServer(config=StubConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            truncate_rate=args.truncate_rate,
+            topics=args.topics,
+            seed=args.seed,
+        )).start()
+        os.environ["GEMINI_API_BASE_URL"] = server.base_url
+
+    os.environ["GEMINI_CACHE_ENABLED"] = "False"
+    os.environ["COURSE_GENERATION_WORKERS"] = str(args.workers)
+    os.environ["GEMINI_BACKEND"] = "replay" if args.replay else "record" if args.record else "live"
+    if args.replay or args.record:
+        os.environ["GEMINI_RECORDINGS_DIR"] = os.path.abspath(args.replay or args.record)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app_backend.settings")
+
+    db_dir = tempfile.TemporaryDirectory()
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+    from authentication.models import CustomUser
+    from courses.models import CourseGenerationJob
+
+    settings.DATABASES["default"]["NAME"] = os.path.join(db_dir.name, "bench.sqlite3")
+    call_command("migrate", verbosity=0)
+    setup_test_environment()  # lets the test client through ALLOWED_HOSTS
+
+    users = [
+        CustomUser.objects.create_user(username=f"bench{i}", email=f"bench{i}@example.com", password="x")
+        for i in range(args.clients)
+    ]
+
+    def request_course(n):
+        try:
+            client = APIClient()
+            client.force_authenticate(users[n % len(users)])
+            started = time.perf_counter()
+            response = client.post("/api/courses/generate/", {"course_name": f"Bench course {n}"}, format="json")
+            return response.status_code, time.perf_counter() - started
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        responses = list(executor.map(request_course, range(args.courses)))
+    accepted = time.perf_counter() - start
+
+    while time.perf_counter() - start < args.timeout:
+        if not CourseGenerationJob.objects.filter(status__in=CourseGenerationJob.ACTIVE_STATUSES).exists():
+            break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    jobs = list(CourseGenerationJob.objects.all())
+    durations = [(job.finished_at - job.created_at).total_seconds() for job in jobs if job.finished_at]
+    finished = sum(job.status == "completed" for job in jobs)
+
+    print(f"backend               : {os.environ['GEMINI_BACKEND']}")
+    print(f"POST latency p50      : {statistics.median(r[1] for r in responses) * 1000:.1f}ms "
+          f"(statuses {sorted({r[0] for r in responses})})")
+    print(f"all requests accepted : {accepted:.2f}s")
+    print(f"jobs completed        : {finished}/{len(jobs)} "
+          f"({sum(job.is_fallback for job in jobs)} with fallback roadmap)")
+    if durations:
+        durations.sort()
+        print(f"job duration p50/p95  : {statistics.median(durations):.2f}s / "
+              f"{durations[int(0.95 * (len(durations) - 1))]:.2f}s")
+    print(f"throughput            : {finished / elapsed:.2f} courses/s over {elapsed:.2f}s")
+    if server is not None:
+        print(f"stub                  : {server.stats()}")
+        server.shutdown()
+
+    from ai_integration.recording import get_recording_store
+    store = get_recording_store()
+    if store is not None:
+        print(f"recordings            : {store.stats()}")
+
+    db_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare per-call requests.post against the shared keep-alive pool.
+
+Runs entirely offline against a local Gemini-shaped stub:
+
+    cd backend/app_backend
+    python -m ai_integration.benchmarks.bench_http_pool --calls 200
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+import requests
+
+
+STUB_BODY = json.dumps({
+    "candidates": [{"content": {"parts": [{"text": "[]"}]}}]
+}).encode()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_BODY)))
+        self.end_headers()
+        self.wfile.write(STUB_BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1beta"
+
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app_backend.settings")
+    django.setup()
+
+    from ai_integration.client import pool_stats
+    from ai_integration.services import AIService
+
+    url = f"{base_url}/models/stub:generateContent"
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        requests.post(url, json={"contents": []}, timeout=10)
+    unpooled = time.perf_counter() - start
+
+    service = AIService()
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        service._call_gemini_api("benchmark prompt")
+    pooled = time.perf_counter() - start
+
+    server.shutdown()
+
+    stats = pool_stats()
+    print(f"requests.post per call : {unpooled:.3f}s ({args.calls} calls)")
+    print(f"shared pooled session  : {pooled:.3f}s ({args.calls} calls)")
+    print(f"speedup                : {unpooled / pooled:.2f}x")
+    print(f"connections opened     : {stats['connections_opened']}")
+    print(f"connections reused     : {stats['connections_reused']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare the old clean + json.loads/regex/ast.literal_eval chain with
+parse_llm_json over the corpus in corpus.py:
+
+    cd backend/app_backend
+    python -m ai_integration.benchmarks.bench_json_parser --repeat 20
+"""
+import argparse
+import ast
+import json
+import re
+import time
+
+from ai_integration.benchmarks.corpus import build_corpus
+from ai_integration.parsing import parse_llm_json
+
+
+def legacy_parse(message: str):
+    """The chain AIService used before parse_llm_json (_clean_api_response + _safe_json_loads)."""
+    message = re.sub(r"```(?:json|javascript|js|python)?", "", message, flags=re.IGNORECASE)
+    message = message.replace("```", "").strip()
+    try:
+        return json.loads(message)
+    except json.JSONDecodeError:
+        fixed = re.sub(r",(\s*[}\]])", r"\1", message)
+        try:
+            return json.loads(fixed)
+        except json.JSONDecodeError:
+            try:
+                return ast.literal_eval(message)
+            except Exception:
+                return {"raw_response": message}
+
+
+def usable(kind: str, value) -> int:
+    """Number of topics / questions a caller could actually use."""
+    if kind == "roadmap":
+        topics = value.get("topics") if isinstance(value, dict) else None
+        if not isinstance(topics, list):
+            return 0
+        return sum(1 for t in topics if isinstance(t, dict) and isinstance(t.get("notes"), str))
+    return len(value) if isinstance(value, list) else 0
+
+
+def timed(fn, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    print(f"{'document':36} {'KB':>7} {'legacy ms':>10} {'new ms':>8} {'legacy ok':>10} {'new ok':>7}")
+
+    totals = [0.0, 0.0, 0, 0]
+    for name, kind, text in corpus:
+        legacy_time = timed(legacy_parse, text, args.repeat)
+        new_time = timed(parse_llm_json, text, args.repeat)
+        legacy_ok = usable(kind, legacy_parse(text))
+        new_ok = usable(kind, parse_llm_json(text))
+        totals[0] += legacy_time
+        totals[1] += new_time
+        totals[2] += legacy_ok
+        totals[3] += new_ok
+        print(
+            f"{name:36} {len(text) / 1024:7.1f} {legacy_time * 1000:10.2f} "
+            f"{new_time * 1000:8.2f} {legacy_ok:10} {new_ok:7}"
+        )
+
+    print(
+        f"{'total':36} {'':7} {totals[0] * 1000:10.2f} {totals[1] * 1000:8.2f} "
+        f"{totals[2]:10} {totals[3]:7}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Deterministic corpus of Gemini-shaped responses for parser benchmarks.
+
+The documents mirror what generate_course_roadmap and generate_quiz get back:
+long markdown notes per topic, optional ```json fences, trailing commas, raw
+newlines/tabs inside strings and responses cut off by maxOutputTokens.
+"""
+import json
+import random
+
+
+_WORDS = (
+    "function variable loop class object module import return value list dict "
+    "set tuple string integer float boolean exception error debug test deploy "
+    "server client request response cache index query schema migration model"
+).split()
+
+
+def _notes(rng: random.Random, words: int) -> str:
+    lines = ["# Overview", ""]
+    while words > 0:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(12))
+        lines.append(f"- {sentence.capitalize()}.")
+        if rng.random() < 0.15:
+            lines += ["", "## Example", "```python", "def example():", '    return "value"\t# tab', "```", ""]
+        words -= 12
+    return "\n".join(lines)
+
+
+def _roadmap(rng: random.Random, topics: int) -> dict:
+    return {
+        "description": "A practical course built from the ground up.",
+        "topics": [
+            {
+                "title": f"Topic {n}",
+                "description": f"What topic {n} covers",
+                "estimated_time": f"{rng.randint(1, 4)} hours",
+                "notes": _notes(rng, rng.randint(600, 1000)),
+            }
+            for n in range(1, topics + 1)
+        ],
+    }
+
+
+def _quiz(rng: random.Random, questions: int = 5) -> list:
+    return [
+        {
+            "id": str(n),
+            "question": f"Question {n} about {rng.choice(_WORDS)}?",
+            "options": [rng.choice(_WORDS) for _ in range(4)],
+            "correct_answer": rng.randint(0, 3),
+            "explanation": "Because it is the defining property.",
+        }
+        for n in range(1, questions + 1)
+    ]
+
+
+def _with_trailing_commas(text: str) -> str:
+    return text.replace("}", ",}").replace("]", ",]").replace("[,]", "[]").replace("{,}", "{}")
+
+
+def build_corpus(seed: int = 7) -> list:
+    """Return (name, kind, text) triples; kind is 'roadmap' or 'quiz'."""
+    rng = random.Random(seed)
+    corpus = []
+
+    for topics in (6, 12, 40):
+        roadmap = _roadmap(rng, topics)
+        pretty = json.dumps(roadmap, indent=2, ensure_ascii=False)
+        raw_newlines = pretty.replace("\\n", "\n").replace("\\t", "\t")
+        size = f"{topics}topics"
+
+        corpus += [
+            (f"roadmap-{size}-clean", "roadmap", pretty),
+            (f"roadmap-{size}-fenced", "roadmap", f"```json\n{pretty}\n```"),
+            (f"roadmap-{size}-trailing-commas", "roadmap", f"```json\n{_with_trailing_commas(pretty)}\n```"),
+            (f"roadmap-{size}-raw-newlines", "roadmap", f"```json\n{raw_newlines}\n```"),
+            (f"roadmap-{size}-truncated", "roadmap", f"```json\n{pretty[: int(len(pretty) * 0.9)]}"),
+        ]
+
+    for n in range(20):
+        quiz = json.dumps(_quiz(rng), indent=2)
+        variant = ("clean", "fenced", "trailing-commas")[n % 3]
+        if variant == "fenced":
+            quiz = f"```json\n{quiz}\n```"
+        elif variant == "trailing-commas":
+            quiz = _with_trailing_commas(quiz)
+        corpus.append((f"quiz-{n}-{variant}", "quiz", quiz))
+
+    return corpus
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from typing import Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for Gemini responses.
+
+    Entries are keyed on (model, prompt, generationConfig) and live in two tiers:
+    a bounded in-memory LRU for the current process and an SQLite file shared by
+    every worker on the box. Both tiers honour the same TTL; the disk tier is
+    trimmed to ``max_disk_bytes`` by evicting the least recently used entries.
+    """
+
+    def __init__(
+        self,
+        max_memory_entries: int = 256,
+        disk_path: Optional[str] = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        ttl: int = 7 * 24 * 3600,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.disk_path = str(disk_path) if disk_path else None
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def make_key(model: str, prompt: str, generation_config: Dict) -> str:
+        material = json.dumps(
+            {"model": model, "prompt": prompt, "generationConfig": generation_config},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            hit = self._disk_get(key, now)
+            if hit is not None:
+                value, expires_at = hit
+                self._counters["disk_hits"] += 1
+                # Keep the disk entry's expiry so promotion never extends its life
+                self._memory_set(key, value, expires_at)
+                return value
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._counters["sets"] += 1
+            self._memory_set(key, value, now + self.ttl)
+            self._disk_set(key, value, now)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry, e.g. when the cached response failed validation."""
+        with self._lock:
+            self._memory.pop(key, None)
+            db = self._connection()
+            if db is not None:
+                with db:
+                    db.execute("DELETE FROM gemini_response_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                with db:
+                    db.execute("DELETE FROM gemini_response_cache")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (
+                (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            )
+            db = self._connection()
+            if db is not None:
+                count, size = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM gemini_response_cache"
+                ).fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+            return stats
+
+    # ----------------------------
+    # Memory tier
+    # ----------------------------
+    def _memory_set(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ----------------------------
+    # Disk tier
+    # ----------------------------
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.disk_path:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.disk_path, timeout=10, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS gemini_response_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " expires_at REAL NOT NULL,"
+                    " last_access REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS gemini_response_cache_last_access"
+                    " ON gemini_response_cache (last_access)"
+                )
+        return self._db
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """(value, expires_at) of a live disk entry, or None."""
+        db = self._connection()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT value, expires_at FROM gemini_response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        with db:
+            if expires_at <= now:
+                db.execute("DELETE FROM gemini_response_cache WHERE key = ?", (key,))
+                return None
+            db.execute(
+                "UPDATE gemini_response_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+        return value, expires_at
+
+    def _disk_set(self, key: str, value: str, now: float) -> None:
+        db = self._connection()
+        if db is None:
+            return
+        size = len(value.encode("utf-8"))
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO gemini_response_cache"
+                " (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + self.ttl, now),
+            )
+            db.execute("DELETE FROM gemini_response_cache WHERE expires_at <= ?", (now,))
+            self._disk_evict(db)
+
+    def _disk_evict(self, db: sqlite3.Connection) -> None:
+        (total,) = db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM gemini_response_cache"
+        ).fetchone()
+        if total <= self.max_disk_bytes:
+            return
+
+        excess = total - self.max_disk_bytes
+        rows = db.execute(
+            "SELECT key, size FROM gemini_response_cache ORDER BY last_access"
+        )
+        victims = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        db.executemany("DELETE FROM gemini_response_cache WHERE key = ?", victims)
+        self._counters["evictions"] += len(victims)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _cache
+    if not settings.GEMINI_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    max_memory_entries=settings.GEMINI_CACHE_MEMORY_ENTRIES,
+                    disk_path=settings.GEMINI_CACHE_PATH,
+                    max_disk_bytes=settings.GEMINI_CACHE_MAX_DISK_BYTES,
+                    ttl=settings.GEMINI_CACHE_TTL,
+                )
+    return _cache
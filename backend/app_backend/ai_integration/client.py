@@ -0,0 +1,88 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from typing import Dict, Optional
+
+
+# A single keep-alive session is shared by every AIService instance in the
+# process, so TCP/TLS connections to the Gemini host are reused across
+# roadmap calls, quiz calls and retries.
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reset_session() -> None:
+    """Close the shared session so the next call builds a fresh pool."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        # Number of distinct hosts kept in the pool manager
+        pool_connections=settings.GEMINI_POOL_CONNECTIONS,
+        # Keep-alive connections kept per host
+        pool_maxsize=settings.GEMINI_POOL_MAXSIZE,
+        # Wait for a free connection instead of opening extra ones per host
+        pool_block=settings.GEMINI_POOL_BLOCK,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+def pool_stats() -> Dict:
+    """Connection reuse counters for every host the shared session has talked to."""
+    stats = {
+        "connections_opened": 0,
+        "connections_reused": 0,
+        "requests": 0,
+        "hosts": [],
+    }
+    session = _session
+    if session is None:
+        return stats
+
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened = pool.num_connections
+            served = pool.num_requests
+            reused = max(served - opened, 0)
+            stats["hosts"].append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                "connections_opened": opened,
+                "connections_reused": reused,
+                "requests": served,
+                "idle_connections": pool.pool.qsize() if pool.pool is not None else 0,
+            })
+            stats["connections_opened"] += opened
+            stats["connections_reused"] += reused
+            stats["requests"] += served
+
+    return stats
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from ai_integration.stub_server import GeminiStubServer, StubConfig
+
+
+class Command(BaseCommand):
+    help = 'Serve a local Gemini-shaped API with configurable latency, errors and truncated JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=1.0, help='Seconds per response.')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- seconds added to latency.')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error.')
+        parser.add_argument('--error-status', type=int, action='append', dest='error_statuses',
+                            help='Status used for injected errors; repeat for several (default 503).')
+        parser.add_argument('--truncate-rate', type=float, default=0.0, help='Fraction of responses cut short.')
+        parser.add_argument('--topics', type=int, default=6, help='Topics per generated roadmap.')
+        parser.add_argument('--notes-words', type=int, default=600, help='Words of notes per topic.')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for repeatable fault injection.')
+
+    def handle(self, *args, **options):
+        config = StubConfig(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            error_statuses=tuple(options['error_statuses'] or (503,)),
+            truncate_rate=options['truncate_rate'],
+            topics=options['topics'],
+            notes_words=options['notes_words'],
+            seed=options['seed'],
+        )
+        server = GeminiStubServer((options['host'], options['port']), config)
+        self.stdout.write(f"Gemini stub listening; set GEMINI_API_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Stub stats: {server.stats()}")
@@ -0,0 +1,183 @@
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Optional, Tuple
+
+
+_decoder = json.JSONDecoder(strict=False)
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+_LITERALS = {
+    "true": True, "false": False, "null": None,
+    # Python-style literals occasionally produced by the model
+    "True": True, "False": False, "None": None,
+}
+
+
+class _Truncated(Exception):
+    """Input ended inside a value; ``partial`` holds whatever could be salvaged."""
+
+    def __init__(self, partial: Any = None):
+        super().__init__()
+        self.partial = partial
+
+
+def parse_llm_json(text: str) -> Optional[Any]:
+    """
+    Parse JSON produced by an LLM without copying or re-scanning the payload.
+
+    Leading prose and markdown fences are skipped by starting at the first
+    "{" or "[", and anything after the closing bracket is ignored. Well-formed
+    output (including raw newlines/tabs inside strings) is decoded in a single
+    C-level pass. Only if that fails does a tolerant parser take over; it
+    accepts trailing commas, single-quoted strings and Python literals, and
+    when the text is truncated returns the largest valid prefix, with open
+    containers closed and the unfinished value dropped. Returns None when no
+    JSON value can be recovered.
+    """
+    if not text:
+        return None
+
+    start = _payload_start(text)
+    if start < 0:
+        return None
+
+    try:
+        return _decoder.raw_decode(text, start)[0]
+    except ValueError:
+        pass
+
+    try:
+        return _TolerantParser(text).parse_value(start)[0]
+    except _Truncated as truncated:
+        return truncated.partial
+    except (ValueError, IndexError):
+        return None
+
+
+def _payload_start(text: str) -> int:
+    brace = text.find("{")
+    bracket = text.find("[")
+    if brace < 0:
+        return bracket
+    if bracket < 0:
+        return brace
+    return min(brace, bracket)
+
+
+class _TolerantParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+
+    def skip(self, i: int) -> int:
+        return _WHITESPACE.match(self.text, i).end()
+
+    def parse_value(self, i: int) -> Tuple[Any, int]:
+        i = self.skip(i)
+        if i >= self.length:
+            raise _Truncated()
+
+        ch = self.text[i]
+        if ch == "{":
+            return self.parse_object(i + 1)
+        if ch == "[":
+            return self.parse_array(i + 1)
+        if ch == '"':
+            return self.parse_string(i + 1)
+        if ch == "'":
+            return self.parse_single_quoted(i + 1)
+
+        match = _NUMBER.match(self.text, i)
+        if match:
+            if match.end() >= self.length:
+                raise _Truncated()
+            integer = not (match.group(1) or match.group(2))
+            return (int if integer else float)(match.group()), match.end()
+
+        for literal, value in _LITERALS.items():
+            if self.text.startswith(literal, i):
+                return value, i + len(literal)
+        rest = self.text[i:i + 5]
+        if i + len(rest) >= self.length and any(literal.startswith(rest) for literal in _LITERALS):
+            raise _Truncated()
+
+        raise ValueError(f"Unexpected character {ch!r} at {i}")
+
+    def parse_object(self, i: int) -> Tuple[dict, int]:
+        result = {}
+        while True:
+            i = self.skip(i)
+            if i >= self.length:
+                raise _Truncated(result)
+
+            ch = self.text[i]
+            if ch == "}":
+                return result, i + 1
+            if ch == ",":
+                # Tolerates trailing and repeated commas
+                i += 1
+                continue
+
+            key = None
+            try:
+                key, i = self.parse_value(i)
+                i = self.skip(i)
+                if i >= self.length:
+                    raise _Truncated()
+                if self.text[i] != ":":
+                    raise ValueError(f"Expected ':' at {i}")
+                value, i = self.parse_value(i + 1)
+            except _Truncated as truncated:
+                if key is not None and isinstance(truncated.partial, (dict, list)):
+                    result[key] = truncated.partial
+                raise _Truncated(result)
+
+            result[key] = value
+
+    def parse_array(self, i: int) -> Tuple[list, int]:
+        result = []
+        while True:
+            i = self.skip(i)
+            if i >= self.length:
+                raise _Truncated(result)
+
+            ch = self.text[i]
+            if ch == "]":
+                return result, i + 1
+            if ch == ",":
+                i += 1
+                continue
+
+            try:
+                value, i = self.parse_value(i)
+            except _Truncated as truncated:
+                if isinstance(truncated.partial, (dict, list)):
+                    result.append(truncated.partial)
+                raise _Truncated(result)
+
+            result.append(value)
+
+    def parse_string(self, i: int) -> Tuple[str, int]:
+        try:
+            # C-accelerated; strict=False keeps raw control characters
+            return scanstring(self.text, i, False)
+        except json.JSONDecodeError as e:
+            if "Unterminated" in e.msg:
+                raise _Truncated()
+            raise ValueError(e.msg)
+
+    def parse_single_quoted(self, i: int) -> Tuple[str, int]:
+        chars = []
+        while i < self.length:
+            ch = self.text[i]
+            if ch == "\\" and i + 1 < self.length:
+                chars.append(self.text[i:i + 2])
+                i += 2
+                continue
+            if ch == "'":
+                body = "".join(chars).replace('"', '\\"').replace("\\'", "'")
+                return scanstring(f'{body}"', 0, False)[0], i + 1
+            chars.append(ch)
+            i += 1
+        raise _Truncated()
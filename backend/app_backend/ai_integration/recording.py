@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from typing import Dict, Optional
+
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+BACKENDS = (LIVE, RECORD, REPLAY)
+
+
+class RecordingStore:
+    """
+    Request/response pairs captured from Gemini, one JSON file per request.
+
+    Files are named after the same key the response cache uses (model +
+    prompt + generation config), so a recording made with one configuration
+    replays only for that configuration. Writes go through a temp file and
+    os.replace, which keeps concurrent recorders from leaving partial files.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._counters = {"recorded": 0, "replayed": 0, "misses": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                text = json.load(f)["response"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._count("misses")
+            return None
+        self._count("replayed")
+        return text
+
+    def save(self, key: str, request: Dict, response: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        record = {"request": request, "response": response, "recorded_at": time.time()}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Could not record Gemini response: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        self._count("recorded")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"directory": str(self.directory), **counters}
+
+
+_store: Optional[RecordingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_backend() -> str:
+    backend = settings.GEMINI_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"GEMINI_BACKEND must be one of {', '.join(BACKENDS)}, got {backend!r}")
+    return backend
+
+
+def get_recording_store() -> Optional[RecordingStore]:
+    """Return the process-wide store, or None when the live backend is in use."""
+    global _store
+    if get_backend() == LIVE:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RecordingStore(settings.GEMINI_RECORDINGS_DIR)
+    return _store
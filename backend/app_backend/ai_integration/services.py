@@ -1,19 +1,47 @@
-import json
-import requests
 import time
-import re
-import ast
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
 from requests.exceptions import RequestException, ConnectionError
-from typing import Dict, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from .cache import ResponseCache, get_response_cache
+from .client import get_session
+from .parsing import parse_llm_json
+from .recording import RECORD, REPLAY, get_backend, get_recording_store
+from .resilience import RETRYABLE_STATUS_CODES, RetryPolicy, get_circuit_breaker
+from .streaming import RoadmapStreamReader, iter_sse_text
 
 
 class AIService:
+    # Rough output size of one quiz question, used to size batched quiz prompts
+    QUIZ_TOKENS_PER_QUESTION = 150
+    # Size of the pieces a replayed response is streamed back in
+    REPLAY_CHUNK_CHARS = 256
+
     def __init__(self):
         self.gemini_api_key = settings.GEMINI_API_KEY
-        self.max_retries = 6
-        self.retry_delay = 4
-        self.timeout = 100
+        self.base_url = settings.GEMINI_API_BASE_URL.rstrip("/")
+        self.model = settings.GEMINI_MODEL
+        self.session = get_session()
+        self.response_cache = get_response_cache()
+        self.backend = get_backend()
+        self.recordings = get_recording_store()
+        self.generation_config = {
+            "temperature": 0.7,
+            "maxOutputTokens": 4096,  # increase tokens for long notes
+            "topP": 1,
+            "topK": 40,
+        }
+        self.max_retries = settings.GEMINI_MAX_RETRIES
+        self.retry_policy = RetryPolicy(
+            max_retries=self.max_retries,
+            base_delay=settings.GEMINI_RETRY_BASE_DELAY,
+            max_delay=settings.GEMINI_RETRY_MAX_DELAY,
+        )
+        self.circuit_breaker = get_circuit_breaker()
+        # (connect, read): fail fast on an unreachable host, allow long generations
+        self.timeout = (settings.GEMINI_CONNECT_TIMEOUT, settings.GEMINI_READ_TIMEOUT)
+        self.quiz_concurrency = settings.GEMINI_QUIZ_CONCURRENCY
+        self.quiz_batched = settings.GEMINI_QUIZ_BATCHED
 
     # ----------------------------
     # Course Roadmap Generation
@@ -24,7 +52,68 @@ class AIService:
         difficulty: str = "beginner",
         duration_weeks: int = 4,
     ) -> Dict:
-        prompt = f"""
+        prompt = self._roadmap_prompt(course_name, difficulty, duration_weeks)
+        response = self._call_gemini_api(prompt)
+        if response:
+            print(f"Gemini API response: {response[:500]}...")  # show preview
+
+        if response:
+            try:
+                roadmap = self._parse_response(response)
+                if isinstance(roadmap, dict) and isinstance(roadmap.get("topics"), list):
+                    # A truncated response keeps its complete topics; drop the cut-off one
+                    roadmap["topics"] = [t for t in roadmap["topics"] if self._validate_topic(t)]
+
+                if roadmap and self._validate_roadmap(roadmap):
+                    return roadmap
+            except Exception as e:
+                print(f"Failed to parse roadmap: {e}")
+            self._discard_cached(prompt)
+
+        return self._get_fallback_roadmap(course_name, difficulty)
+
+    def stream_course_roadmap(
+        self,
+        course_name: str,
+        difficulty: str = "beginner",
+        duration_weeks: int = 4,
+    ) -> Iterator[Tuple[str, object]]:
+        """
+        Stream a roadmap through streamGenerateContent.
+
+        Yields ("description", str) and then ("topic", dict) for every topic as
+        soon as its JSON object is complete, so callers can persist and show
+        topics while the rest of the roadmap is still being generated. If the
+        stream yields no valid topic, the fallback roadmap is streamed instead.
+        """
+        prompt = self._roadmap_prompt(course_name, difficulty, duration_weeks)
+        reader = RoadmapStreamReader()
+        topics_sent = 0
+        chunks = []
+
+        for text in self._stream_gemini_api(prompt):
+            chunks.append(text)
+            for kind, value in reader.feed(text):
+                if kind == "topic":
+                    if not self._validate_topic(value):
+                        print(f"Skipping invalid streamed topic: {str(value)[:100]}...")
+                        continue
+                    topics_sent += 1
+                yield kind, value
+
+        if topics_sent:
+            if self.response_cache is not None and reader.finished:
+                self.response_cache.set(self._cache_key(prompt), "".join(chunks))
+            return
+
+        print("Streaming roadmap produced no topics, using fallback roadmap")
+        fallback = self._get_fallback_roadmap(course_name, difficulty)
+        yield "description", fallback["description"]
+        for topic in fallback["topics"]:
+            yield "topic", topic
+
+    def _roadmap_prompt(self, course_name: str, difficulty: str, duration_weeks: int) -> str:
+        return f"""
         Create a comprehensive and deeply detailed learning roadmap for a course titled "{course_name}".
 
         Target difficulty: {difficulty}
@@ -51,24 +140,6 @@ class AIService:
         - Only output the raw JSON—no extra commentary.
         """.strip()
 
-        response = self._call_gemini_api(prompt)
-        print(f"Gemini API response: {response[:500]}...")  # show preview
-
-        if response:
-            try:
-                if isinstance(response, str):
-                    response = self._clean_api_response(response)
-                    roadmap = self._safe_json_loads(response)
-                else:
-                    roadmap = response
-
-                if roadmap and self._validate_roadmap(roadmap):
-                    return roadmap
-            except Exception as e:
-                print(f"Failed to parse roadmap: {e}")
-
-        return self._get_fallback_roadmap(course_name, difficulty)
-
     # ----------------------------
     # Quiz Generation
     # ----------------------------
@@ -91,93 +162,356 @@ class AIService:
 
         if response:
             try:
-                if isinstance(response, str):
-                    response = self._clean_api_response(response)
-                quiz = self._safe_json_loads(response)
+                quiz = self._parse_response(response)
 
                 if self._validate_quiz(quiz):
                     return quiz
             except Exception as e:
                 print(f"Quiz parse error: {e}")
+            self._discard_cached(prompt)
 
         return self._get_fallback_quiz(topic_title, course_name, num_questions)
 
+    def generate_quizzes(
+        self,
+        topic_titles: List[str],
+        course_name: str,
+        num_questions: int = 5,
+        max_workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        batched: Optional[bool] = None,
+    ) -> List[list]:
+        """Generate one quiz per topic, in the same order as topic_titles.
+
+        Requests run concurrently, at most ``max_workers`` (default
+        ``GEMINI_QUIZ_CONCURRENCY``) at a time. With ``batched`` (default
+        ``GEMINI_QUIZ_BATCHED``) several topics share one prompt; see
+        generate_quizzes_batched. ``on_progress`` is called from the calling
+        thread with the number of quizzes finished so far.
+        """
+        if batched is None:
+            batched = self.quiz_batched
+        if batched:
+            return self.generate_quizzes_batched(
+                topic_titles, course_name, num_questions, max_workers, on_progress
+            )
+
+        done = 0
+
+        def report(index, quiz):
+            nonlocal done
+            done += 1
+            if on_progress:
+                on_progress(done)
+
+        return self._map_concurrently(
+            lambda title: self.generate_quiz(title, course_name, num_questions),
+            topic_titles,
+            max_workers,
+            report,
+        )
+
+    def generate_quizzes_batched(
+        self,
+        topic_titles: List[str],
+        course_name: str,
+        num_questions: int = 5,
+        max_workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> List[list]:
+        """Generate quizzes for many topics with one prompt per chunk of topics.
+
+        Chunks are sized so a full answer fits in ``maxOutputTokens``. Each
+        returned quiz is validated on its own; topics whose quiz is missing or
+        invalid are regenerated individually through generate_quiz, which
+        applies the usual per-topic fallback.
+        """
+        if not topic_titles:
+            return []
+
+        chunk_size = self._quiz_batch_size(num_questions)
+        chunks = [
+            list(range(start, min(start + chunk_size, len(topic_titles))))
+            for start in range(0, len(topic_titles), chunk_size)
+        ]
+
+        quizzes = [None] * len(topic_titles)
+        done = 0
+
+        def collect(chunk_index, chunk_quizzes):
+            nonlocal done
+            for i, quiz in zip(chunks[chunk_index], chunk_quizzes):
+                if quiz is not None:
+                    quizzes[i] = quiz
+                    done += 1
+            if on_progress:
+                on_progress(done)
+
+        self._map_concurrently(
+            lambda chunk: self._generate_quiz_chunk(
+                [topic_titles[i] for i in chunk], course_name, num_questions
+            ),
+            chunks,
+            max_workers,
+            collect,
+        )
+
+        missing = [i for i, quiz in enumerate(quizzes) if quiz is None]
+        if missing:
+            print(f"Batched quiz generation missed {len(missing)} topic(s), retrying individually")
+
+            def fill(position, quiz):
+                nonlocal done
+                quizzes[missing[position]] = quiz
+                done += 1
+                if on_progress:
+                    on_progress(done)
+
+            self._map_concurrently(
+                lambda i: self.generate_quiz(topic_titles[i], course_name, num_questions),
+                missing,
+                max_workers,
+                fill,
+            )
+
+        return quizzes
+
+    def _generate_quiz_chunk(
+        self, topic_titles: List[str], course_name: str, num_questions: int
+    ) -> List[Optional[list]]:
+        """One prompt for several topics; None marks a topic without a valid quiz."""
+        topic_lines = "\n".join(
+            f'        {n}. "{title}"' for n, title in enumerate(topic_titles, start=1)
+        )
+        prompt = f"""
+        Create a {num_questions}-question quiz for each of the following topics in "{course_name}":
+{topic_lines}
+
+        Each question should have:
+        - "id": string (unique for each question)
+        - "question": the question text
+        - "options": array of 4 answer options
+        - "correct_answer": index (0-3) of the correct option
+        - "explanation": a brief explanation
+
+        Return ONLY a JSON object whose keys are the topic numbers above (as strings,
+        e.g. "1") and whose values are the JSON arrays of questions for that topic,
+        no extra text or markdown.
+        """
+
+        results = [None] * len(topic_titles)
+        response = self._call_gemini_api(prompt)
+        if not response:
+            return results
+
+        try:
+            batch = self._parse_response(response)
+        except Exception as e:
+            print(f"Quiz batch parse error: {e}")
+            batch = None
+
+        if isinstance(batch, list) and len(batch) == len(topic_titles):
+            batch = {str(n): quiz for n, quiz in enumerate(batch, start=1)}
+
+        if isinstance(batch, dict):
+            for n in range(1, len(topic_titles) + 1):
+                quiz = batch.get(str(n))
+                if quiz and self._validate_quiz(quiz):
+                    results[n - 1] = quiz
+
+        if all(quiz is None for quiz in results):
+            self._discard_cached(prompt)
+        return results
+
+    def _quiz_batch_size(self, num_questions: int) -> int:
+        """How many topics' quizzes fit in one response, leaving some headroom."""
+        budget = int(self.generation_config["maxOutputTokens"] * 0.8)
+        per_topic = max(num_questions, 1) * self.QUIZ_TOKENS_PER_QUESTION
+        return max(1, budget // per_topic)
+
+    def _map_concurrently(
+        self,
+        fn: Callable,
+        items: list,
+        max_workers: Optional[int] = None,
+        on_result: Optional[Callable] = None,
+    ) -> list:
+        """Apply fn to every item on the bounded pool, keeping input order.
+
+        ``on_result(index, result)`` runs in the calling thread as results arrive.
+        """
+        if not items:
+            return []
+
+        results = [None] * len(items)
+        workers = max(1, min(max_workers or self.quiz_concurrency, len(items)))
+        if workers == 1:
+            for i, item in enumerate(items):
+                results[i] = fn(item)
+                if on_result:
+                    on_result(i, results[i])
+            return results
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-quiz") as executor:
+            futures = {executor.submit(fn, item): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                if on_result:
+                    on_result(i, results[i])
+        return results
+
     # ----------------------------
     # Gemini API Call
     # ----------------------------
     def _call_gemini_api(self, prompt: str) -> Optional[Union[Dict, str]]:
+        url = f"{self.base_url}/models/{self.model}:generateContent?key={self.gemini_api_key}"
+
+        cache_key = self._cache_key(prompt)
+        if self.backend == REPLAY:
+            return self._replay(cache_key)
+        # Recording skips cache reads so every prompt actually reaches the API
+        if self.response_cache is not None and self.backend != RECORD:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": self.generation_config,
+        }
+
+        response = self._post_with_retries(url, payload)
+        if response is None:
+            return None
+
+        try:
+            result = response.json()
+            text = result["candidates"][0]["content"]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Unexpected Gemini API response shape: {e}")
+            return None
+
+        if self.response_cache is not None:
+            self.response_cache.set(cache_key, text)
+        if self.backend == RECORD:
+            self.recordings.save(cache_key, self._recording_request(prompt), text)
+        return text
+
+    def _stream_gemini_api(self, prompt: str) -> Iterator[str]:
+        """Yield generated text chunks from streamGenerateContent as they arrive."""
+        cache_key = self._cache_key(prompt)
+        if self.backend == REPLAY:
+            text = self._replay(cache_key)
+            if text:
+                # Re-chunk so stream consumers see the same incremental shape
+                for start in range(0, len(text), self.REPLAY_CHUNK_CHARS):
+                    yield text[start:start + self.REPLAY_CHUNK_CHARS]
+            return
+
+        cached = None
+        if self.response_cache is not None and self.backend != RECORD:
+            cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
         url = (
-            f"https://generativelanguage.googleapis.com/v1beta/models/"
-            f"gemini-1.5-flash:generateContent?key={self.gemini_api_key}"
+            f"{self.base_url}/models/{self.model}:streamGenerateContent"
+            f"?alt=sse&key={self.gemini_api_key}"
         )
-
         payload = {
             "contents": [{"role": "user", "parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 4096,  # increase tokens for long notes
-                "topP": 1,
-                "topK": 40,
-            },
+            "generationConfig": self.generation_config,
         }
 
-        for attempt in range(self.max_retries):
+        response = self._post_with_retries(url, payload, stream=True)
+        if response is None:
+            return
+
+        chunks = []
+        with response:
+            response.encoding = response.encoding or "utf-8"
             try:
-                response = requests.post(
-                    url,
-                    headers={"Content-Type": "application/json"},
-                    json=payload,
-                    timeout=self.timeout,
-                )
+                for text in iter_sse_text(response.iter_lines(decode_unicode=True)):
+                    chunks.append(text)
+                    yield text
+            except (RequestException, ConnectionError) as e:
+                # Text already yielded cannot be taken back, so don't retry mid-stream
+                print(f"Gemini stream interrupted: {e}")
+                return
 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["candidates"][0]["content"]["parts"][0]["text"]
+        if self.backend == RECORD and chunks:
+            self.recordings.save(cache_key, self._recording_request(prompt), "".join(chunks))
 
-                print(f"Gemini API attempt {attempt + 1} failed: {response.status_code}")
-                if attempt == self.max_retries - 1:
-                    return None
+    def _replay(self, cache_key: str) -> Optional[str]:
+        text = self.recordings.load(cache_key)
+        if text is None:
+            print(f"No recorded Gemini response for {cache_key[:12]}, treating as a failed call")
+        return text
+
+    def _recording_request(self, prompt: str) -> Dict:
+        return {"model": self.model, "prompt": prompt, "generationConfig": self.generation_config}
+
+    def _post_with_retries(self, url: str, payload: Dict, stream: bool = False):
+        """
+        POST to Gemini, returning the 200 response or None.
+
+        Transient failures are retried with exponential backoff and jitter
+        (or the server's Retry-After). Every attempt feeds the shared circuit
+        breaker, and while it is open no request is sent at all.
+        """
+        if not self.circuit_breaker.allow_request():
+            print("Gemini circuit breaker is open, skipping API call")
+            return None
 
+        for attempt in range(self.max_retries):
+            retry_after = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout, stream=stream)
             except (RequestException, ConnectionError) as e:
                 print(f"Connection attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
+                self.circuit_breaker.record_failure()
+            else:
+                if response.status_code == 200:
+                    self.circuit_breaker.record_success()
+                    return response
+
+                response.close()
+                print(f"Gemini API attempt {attempt + 1} failed: {response.status_code}")
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # The API is up but rejected this request; retrying won't help
+                    self.circuit_breaker.record_success()
                     return None
-                time.sleep(self.retry_delay * (attempt + 1))
+                self.circuit_breaker.record_failure()
+                retry_after = RetryPolicy.parse_retry_after(response.headers.get("Retry-After"))
+
+            if attempt == self.max_retries - 1 or self.circuit_breaker.is_open:
+                break
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if delay is None:
+                print(f"Gemini asked to retry after {retry_after:.0f}s, giving up instead")
+                break
+            time.sleep(delay)
 
         return None
 
+    def _cache_key(self, prompt: str) -> str:
+        return ResponseCache.make_key(self.model, prompt, self.generation_config)
+
+    def _discard_cached(self, prompt: str) -> None:
+        """Forget a cached response that failed to parse or validate."""
+        if self.response_cache is not None:
+            self.response_cache.discard(self._cache_key(prompt))
+
     # ----------------------------
     # Response Cleaning & Parsing
     # ----------------------------
-    def _clean_api_response(self, message: str) -> str:
-        """Clean Gemini API response for safe JSON parsing."""
-        if not message:
-            return ""
-
-        # Remove Markdown fences like ```json ... ```
-        message = re.sub(r"```(?:json|javascript|js|python)?", "", message, flags=re.IGNORECASE)
-        message = message.replace("```", "")
-
-        # Strip leading/trailing whitespace
-        message = message.strip()
-
-        return message
-
-    def _safe_json_loads(self, s: str):
-        """Try parsing JSON safely, with fallbacks."""
-        try:
-            return json.loads(s)
-        except json.JSONDecodeError:
-            # Try removing trailing commas
-            fixed = re.sub(r",(\s*[}\]])", r"\1", s)
-            try:
-                return json.loads(fixed)
-            except json.JSONDecodeError:
-                try:
-                    return ast.literal_eval(s)
-                except Exception:
-                    print("Final parse fallback triggered, returning raw string")
-                    return {"raw_response": s}
+    def _parse_response(self, response: Union[Dict, list, str]):
+        """Decode a Gemini text response in one pass; see parse_llm_json."""
+        if isinstance(response, str):
+            return parse_llm_json(response)
+        return response
 
     # ----------------------------
     # Validation
@@ -194,15 +528,18 @@ class AIService:
             return False
 
         for topic in roadmap["topics"]:
-            if not isinstance(topic, dict):
-                return False
-            if "title" not in topic or "description" not in topic or "notes" not in topic:
-                return False
-            if not all(isinstance(topic[k], str) for k in ["title", "description", "notes"]):
+            if not self._validate_topic(topic):
                 return False
 
         return True
 
+    def _validate_topic(self, topic: dict) -> bool:
+        if not isinstance(topic, dict):
+            return False
+        if "title" not in topic or "description" not in topic or "notes" not in topic:
+            return False
+        return all(isinstance(topic[k], str) for k in ["title", "description", "notes"])
+
     def _validate_quiz(self, quiz: list) -> bool:
         if not isinstance(quiz, list):
             return False
@@ -0,0 +1,137 @@
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .parsing import parse_llm_json
+
+
+def iter_sse_text(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the generated text carried by each `data:` event of a streamGenerateContent?alt=sse response."""
+    for line in lines:
+        if not line or not line.startswith("data:"):
+            continue
+        try:
+            chunk = json.loads(line[5:].strip())
+            parts = chunk["candidates"][0]["content"]["parts"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        for part in parts:
+            text = part.get("text")
+            if text:
+                yield text
+
+
+class RoadmapStreamReader:
+    """
+    Incremental reader for a streamed roadmap of the form
+    {"description": "...", "topics": [{...}, {...}]}.
+
+    Text is fed in arbitrary chunks; every call to feed() returns the events
+    completed so far: ("description", str) once the top-level description
+    string is closed and ("topic", dict) for each topic object as soon as its
+    closing brace arrives. Anything before the first "{" (e.g. a ```json fence)
+    is skipped, and text already handed out is dropped from the buffer.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start: Optional[int] = None
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._topics_depth: Optional[int] = None
+        self._topic_start: Optional[int] = None
+        self.finished = False
+
+    def feed(self, text: str) -> List[Tuple[str, object]]:
+        events: List[Tuple[str, object]] = []
+        if self.finished:
+            return events
+
+        self._buf += text
+        buf = self._buf
+        i = self._pos
+        n = len(buf)
+
+        while i < n and not self.finished:
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._end_string(buf[self._string_start:i + 1], events)
+                    self._string_start = None
+                i += 1
+                continue
+
+            if not self._stack and ch != "{":
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == "{":
+                self._stack.append(ch)
+                depth = len(self._stack)
+                if depth == 1:
+                    self._expect_key = True
+                elif self._topics_depth is not None and depth == self._topics_depth + 1:
+                    self._topic_start = i
+            elif ch == "[":
+                self._stack.append(ch)
+                if len(self._stack) == 2 and self._key == "topics":
+                    self._topics_depth = 2
+            elif ch in "}]":
+                depth = len(self._stack)
+                self._stack.pop()
+                if ch == "}" and self._topic_start is not None and depth == self._topics_depth + 1:
+                    self._end_topic(buf[self._topic_start:i + 1], events)
+                    self._topic_start = None
+                elif ch == "]" and depth == self._topics_depth:
+                    self._topics_depth = None
+                if not self._stack:
+                    self.finished = True
+            elif ch == "," and len(self._stack) == 1:
+                self._expect_key = True
+            i += 1
+
+        # Keep only the part of the buffer an open string or topic still needs
+        keep_from = i
+        for start in (self._string_start, self._topic_start):
+            if start is not None:
+                keep_from = min(keep_from, start)
+        self._buf = buf[keep_from:]
+        self._pos = i - keep_from
+        if self._string_start is not None:
+            self._string_start -= keep_from
+        if self._topic_start is not None:
+            self._topic_start -= keep_from
+
+        return events
+
+    def _end_string(self, raw: str, events: List[Tuple[str, object]]) -> None:
+        if len(self._stack) != 1:
+            return
+        try:
+            # strict=False accepts raw newlines/tabs inside the description
+            value = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            value = None
+        if self._expect_key:
+            self._key = value
+            self._expect_key = False
+        elif self._key == "description" and isinstance(value, str):
+            events.append(("description", value))
+
+    def _end_topic(self, raw: str, events: List[Tuple[str, object]]) -> None:
+        topic = parse_llm_json(raw)
+        if isinstance(topic, dict):
+            events.append(("topic", topic))
+        else:
+            print(f"Skipping unparseable streamed topic: {raw[:100]}...")
@@ -0,0 +1,195 @@
+"""
+A local, Gemini-shaped HTTP server for exercising AIService offline.
+
+It answers generateContent and streamGenerateContent?alt=sse with canned
+roadmaps and quizzes sized from the prompt, and can inject latency, error
+statuses and truncated JSON at configurable rates:
+
+    python manage.py run_gemini_stub --latency 1.5 --error-rate 0.05
+    GEMINI_API_BASE_URL=http://127.0.0.1:8765/v1beta python manage.py runserver
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+_NUM_QUESTIONS = re.compile(r"Create a (\d+)-question quiz")
+_BATCH_TOPIC = re.compile(r'^\s*(\d+)\. "(.*)"\s*$', re.MULTILINE)
+_QUIZ_TOPIC = re.compile(r'quiz about "(.*?)" in "(.*?)"')
+_COURSE_TITLE = re.compile(r'course titled "(.*?)"')
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Tuple[int, ...] = (503,),
+        truncate_rate: float = 0.0,
+        topics: int = 6,
+        notes_words: int = 600,
+        stream_chunks: int = 20,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.truncate_rate = truncate_rate
+        self.topics = topics
+        self.notes_words = notes_words
+        self.stream_chunks = stream_chunks
+        self.random = random.Random(seed)
+
+
+def build_response_text(prompt: str, config: StubConfig) -> str:
+    """Produce the JSON text a well-behaved model would return for one of AIService's prompts."""
+    if "learning roadmap" in prompt:
+        match = _COURSE_TITLE.search(prompt)
+        return json.dumps(_roadmap(match.group(1) if match else "Course", config))
+
+    match = _NUM_QUESTIONS.search(prompt)
+    num_questions = int(match.group(1)) if match else 5
+
+    if "for each of the following topics" in prompt:
+        return json.dumps({
+            number: _quiz(title, num_questions)
+            for number, title in _BATCH_TOPIC.findall(prompt)
+        })
+
+    match = _QUIZ_TOPIC.search(prompt)
+    return json.dumps(_quiz(match.group(1) if match else "Topic", num_questions))
+
+
+def _roadmap(course_name: str, config: StubConfig) -> Dict:
+    notes = " ".join(["practice"] * config.notes_words)
+    return {
+        "description": f"A stub course on {course_name}.",
+        "topics": [
+            {
+                "title": f"{course_name} part {n}",
+                "description": f"Part {n} of {course_name}",
+                "estimated_time": "2 hours",
+                "notes": f"# Part {n}\n\n{notes}",
+            }
+            for n in range(1, config.topics + 1)
+        ],
+    }
+
+
+def _quiz(topic_title: str, num_questions: int) -> List[Dict]:
+    return [
+        {
+            "id": str(n),
+            "question": f"Stub question {n} about {topic_title}?",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": n % 4,
+            "explanation": f"Stub explanation {n}.",
+        }
+        for n in range(1, num_questions + 1)
+    ]
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        config = server.config
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        streaming = ":streamGenerateContent" in self.path
+
+        with server.lock:
+            roll_error = config.random.random()
+            roll_truncate = config.random.random()
+            delay = max(config.latency + config.random.uniform(-config.jitter, config.jitter), 0.0)
+            server.counters["requests"] += 1
+
+        if roll_error < config.error_rate:
+            time.sleep(delay)
+            self._send_error(config.random.choice(config.error_statuses))
+            return
+
+        try:
+            prompt = json.loads(body)["contents"][0]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._send_error(400)
+            return
+
+        text = build_response_text(prompt, config)
+        if roll_truncate < config.truncate_rate:
+            text = text[:config.random.randint(1, max(len(text) - 1, 1))]
+            server.count("truncated")
+
+        if streaming:
+            self._send_stream(text, delay, config.stream_chunks)
+        else:
+            time.sleep(delay)
+            self._send_json(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+        server.count("succeeded")
+
+    def _send_error(self, status: int) -> None:
+        self.server.count("errors")
+        self._send_json(status, {"error": {"code": status, "message": "Injected by Gemini stub"}})
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text: str, delay: float, chunks: int) -> None:
+        # Chunked transfer so the client sees events as they are written
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        size = max(len(text) // max(chunks, 1), 1)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        for piece in pieces:
+            time.sleep(delay / len(pieces))
+            event = json.dumps({"candidates": [{"content": {"parts": [{"text": piece}]}}]})
+            data = f"data: {event}\r\n\r\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GeminiStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), config: Optional[StubConfig] = None):
+        super().__init__(address, GeminiStubHandler)
+        self.config = config or StubConfig()
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "succeeded": 0, "errors": 0, "truncated": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def start(self) -> "GeminiStubServer":
+        """Serve from a daemon thread; returns self so it can be chained."""
+        threading.Thread(target=self.serve_forever, daemon=True, name="gemini-stub").start()
+        return self
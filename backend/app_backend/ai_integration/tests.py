@@ -1,3 +1,37 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase
+from .cache import ResponseCache
 
-# Create your tests here.
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.disk_path = os.path.join(directory.name, 'cache.sqlite3')
+
+    def make_cache(self):
+        cache = ResponseCache(disk_path=self.disk_path, ttl=100)
+        self.addCleanup(lambda: cache._db and cache._db.close())
+        return cache
+
+    def test_memory_and_disk_hits(self):
+        cache = self.make_cache()
+        cache.set('k', 'v')
+        self.assertEqual(cache.get('k'), 'v')
+        # A second process only has the disk tier
+        other = self.make_cache()
+        self.assertEqual(other.get('k'), 'v')
+        self.assertEqual(other.stats()['disk_hits'], 1)
+
+    def test_disk_hit_keeps_remaining_ttl(self):
+        with mock.patch('ai_integration.cache.time.time', return_value=1000.0):
+            self.make_cache().set('k', 'v')
+
+        cache = self.make_cache()
+        with mock.patch('ai_integration.cache.time.time', return_value=1090.0):
+            self.assertEqual(cache.get('k'), 'v')
+        self.assertEqual(cache._memory['k'][0], 1100.0)
+        with mock.patch('ai_integration.cache.time.time', return_value=1101.0):
+            self.assertIsNone(cache.get('k'))
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import AIServiceStatusAPIView
+
+urlpatterns = [
+    path('status/', AIServiceStatusAPIView.as_view(), name='ai_service_status'),
+]
@@ -0,0 +1,22 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .cache import get_response_cache
+from .client import pool_stats
+from .recording import get_backend, get_recording_store
+from .resilience import get_circuit_breaker
+
+
+class AIServiceStatusAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        cache = get_response_cache()
+        recordings = get_recording_store()
+        return Response({
+            'backend': get_backend(),
+            'recordings': recordings.stats() if recordings is not None else None,
+            'circuit_breaker': get_circuit_breaker().snapshot(),
+            'connection_pool': pool_stats(),
+            'response_cache': cache.stats() if cache is not None else None,
+        })
@@ -0,0 +1,47 @@
+import re
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+
+_ACCEPTS_BR = re.compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Negotiated response compression: brotli when the `brotli` package is
+    installed and the client accepts it, gzip otherwise.
+
+    Responses that already carry a Content-Encoding (e.g. notes served from
+    their stored gzip bytes) pass through untouched, and so do server-sent
+    event streams, which must reach the client chunk by chunk.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+
+        if (
+            brotli is not None
+            and not response.streaming
+            and not response.has_header('Content-Encoding')
+            and len(response.content) >= 200
+            and _ACCEPTS_BR.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        ):
+            patch_vary_headers(response, ('Accept-Encoding',))
+            compressed = brotli.compress(response.content, quality=5)
+            if len(compressed) < len(response.content):
+                response.content = compressed
+                response.headers['Content-Length'] = str(len(compressed))
+                response.headers['Content-Encoding'] = 'br'
+                # Same as GZipMiddleware: the body changed, so the ETag is now weak
+                etag = response.get('ETag')
+                if etag and etag.startswith('"'):
+                    response.headers['ETag'] = 'W/' + etag
+                return response
+
+        return super().process_response(request, response)
@@ -43,10 +43,13 @@ INSTALLED_APPS = [
     'authentication',
     'courses',
     'user_progress',
+    'ai_integration',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    # Before anything that reads or rewrites the response body
+    'app_backend.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -166,6 +169,61 @@ CORS_ALLOW_CREDENTIALS = True
 
 # AI Integration Settings
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
+# Point at a local stub (e.g. http://127.0.0.1:8765/v1beta) to benchmark offline
+GEMINI_API_BASE_URL = config('GEMINI_API_BASE_URL', default='https://generativelanguage.googleapis.com/v1beta')
+GEMINI_MODEL = config('GEMINI_MODEL', default='gemini-1.5-flash')
+# Shared keep-alive connection pool used by every AIService instance
+GEMINI_POOL_CONNECTIONS = config('GEMINI_POOL_CONNECTIONS', default=4, cast=int)
+GEMINI_POOL_MAXSIZE = config('GEMINI_POOL_MAXSIZE', default=8, cast=int)
+GEMINI_POOL_BLOCK = config('GEMINI_POOL_BLOCK', default=True, cast=bool)
+# Timeouts, retries (exponential backoff with jitter) and the shared circuit breaker
+GEMINI_CONNECT_TIMEOUT = config('GEMINI_CONNECT_TIMEOUT', default=5, cast=float)
+GEMINI_READ_TIMEOUT = config('GEMINI_READ_TIMEOUT', default=100, cast=float)
+GEMINI_MAX_RETRIES = config('GEMINI_MAX_RETRIES', default=4, cast=int)
+GEMINI_RETRY_BASE_DELAY = config('GEMINI_RETRY_BASE_DELAY', default=1.0, cast=float)
+GEMINI_RETRY_MAX_DELAY = config('GEMINI_RETRY_MAX_DELAY', default=20.0, cast=float)
+GEMINI_BREAKER_FAILURE_THRESHOLD = config('GEMINI_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+GEMINI_BREAKER_RECOVERY_TIMEOUT = config('GEMINI_BREAKER_RECOVERY_TIMEOUT', default=30.0, cast=float)
+# Two-tier (memory LRU + SQLite file) cache of Gemini responses
+GEMINI_CACHE_ENABLED = config('GEMINI_CACHE_ENABLED', default=True, cast=bool)
+GEMINI_CACHE_PATH = config('GEMINI_CACHE_PATH', default=str(BASE_DIR / 'gemini_cache.sqlite3'))
+GEMINI_CACHE_TTL = config('GEMINI_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+GEMINI_CACHE_MEMORY_ENTRIES = config('GEMINI_CACHE_MEMORY_ENTRIES', default=256, cast=int)
+GEMINI_CACHE_MAX_DISK_BYTES = config('GEMINI_CACHE_MAX_DISK_BYTES', default=64 * 1024 * 1024, cast=int)
+# 'live' calls Gemini, 'record' also saves every response to GEMINI_RECORDINGS_DIR,
+# 'replay' serves only saved responses and never touches the network
+GEMINI_BACKEND = config('GEMINI_BACKEND', default='live')
+GEMINI_RECORDINGS_DIR = config('GEMINI_RECORDINGS_DIR', default=str(BASE_DIR / 'gemini_recordings'))
+# Maximum number of per-topic quiz requests sent to Gemini at the same time
+GEMINI_QUIZ_CONCURRENCY = config('GEMINI_QUIZ_CONCURRENCY', default=4, cast=int)
+# Ask for several topics' quizzes in one prompt instead of one prompt per topic
+GEMINI_QUIZ_BATCHED = config('GEMINI_QUIZ_BATCHED', default=False, cast=bool)
+# Course generation jobs run on this many in-process worker threads; set to 0
+# to leave them to `manage.py run_generation_worker`
+COURSE_GENERATION_WORKERS = config('COURSE_GENERATION_WORKERS', default=2, cast=int)
+# Seconds between checks of the job table by the in-process workers, so jobs
+# queued before a restart (or by another process) are still picked up
+COURSE_GENERATION_POLL_SECONDS = config('COURSE_GENERATION_POLL_SECONDS', default=10.0, cast=float)
+# Seconds a generation job may stay unclaimed, or run without a progress update,
+# before it is treated as dead and an identical request may start a fresh job
+COURSE_GENERATION_LEASE_SECONDS = config('COURSE_GENERATION_LEASE_SECONDS', default=900, cast=int)
+
+# Serialized course/notes/quiz payloads. LocMemCache is per process; point
+# this at a shared backend (Redis, Memcached) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'intelligrade-content',
+        'OPTIONS': {'MAX_ENTRIES': config('CONTENT_CACHE_MAX_ENTRIES', default=2000, cast=int)},
+    }
+}
+COURSE_CONTENT_CACHE_TIMEOUT = config('COURSE_CONTENT_CACHE_TIMEOUT', default=24 * 3600, cast=int)
+
+# Queue notes views in memory and write them in periodic batches instead of
+# per request (see courses.view_tracking); off by default
+NOTES_VIEW_WRITE_BEHIND = config('NOTES_VIEW_WRITE_BEHIND', default=False, cast=bool)
+NOTES_VIEW_FLUSH_SECONDS = config('NOTES_VIEW_FLUSH_SECONDS', default=5.0, cast=float)
+NOTES_VIEW_MAX_PENDING = config('NOTES_VIEW_MAX_PENDING', default=500, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
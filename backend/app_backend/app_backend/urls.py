@@ -24,20 +24,31 @@ def index(request):
     
     <h3>Courses (/api/courses/)</h3>
     <ul>
-        <li>POST /api/courses/generate/ - Generate new course</li>
+        <li>POST /api/courses/generate/ - Start generating a new course (202 with job id)</li>
+        <li>POST /api/courses/generate/stream/ - Generate a new course, streaming topics as server-sent events</li>
+        <li>GET /api/courses/generate/{job_id}/ - Get course generation job status</li>
         <li>GET /api/courses/{course_id}/ - Get specific course</li>
         <li>GET /api/courses/topic/{topic_id}/notes/ - Get topic notes</li>
+        <li>GET /api/courses/topic/{topic_id}/notes/raw/ - Get topic notes as Markdown (gzip passthrough)</li>
+        <li>GET /api/courses/notes-views/status/ - Notes view tracking counters (admin)</li>
         <li>GET /api/courses/topic/{topic_id}/quiz/ - Get topic quiz</li>
         <li>POST /api/courses/topic/{topic_id}/submit-quiz/ - Submit quiz answers</li>
-        <li>GET /api/courses/my-courses/ - Get user's courses</li>
-        <li>GET /api/courses/featured/ - Get featured courses</li>
+        <li>GET /api/courses/search/?q= - Search courses, topics and notes</li>
+        <li>GET /api/courses/my-courses/ - Get user's courses (cursor-paginated)</li>
+        <li>GET /api/courses/featured/ - Get featured courses (cursor-paginated)</li>
     </ul>
     
     <h3>User Progress (/api/progress/)</h3>
     <ul>
-        <li>GET /api/progress/analytics/ - Get study analytics</li>
+        <li>GET /api/progress/analytics/?days=7|30|90|365 - Get study analytics</li>
         <li>GET /api/progress/achievements/ - Get user achievements</li>
         <li>POST /api/progress/log-session/ - Log study session</li>
+        <li>POST /api/progress/log-sessions/bulk/ - Log a batch of study sessions (offline sync)</li>
+    </ul>
+    
+    <h3>AI Integration (/api/ai/)</h3>
+    <ul>
+        <li>GET /api/ai/status/ - AI service health and connection pool stats (admin only)</li>
     </ul>
     
     <h3>Admin</h3>
@@ -51,6 +62,7 @@ urlpatterns = [
     path('api/auth/', include('authentication.urls')),
     path('api/courses/', include('courses.urls')),
     path('api/progress/', include('user_progress.urls')),
+    path('api/ai/', include('ai_integration.urls')),
     path('', index, name='index'),
 ]
 
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from authentication.streaks import rebuild_learning_streaks
+
+
+class Command(BaseCommand):
+    help = 'Recompute every profile\'s learning streak state from study sessions and completed topics.'
+
+    def handle(self, *args, **options):
+        changed = rebuild_learning_streaks()
+        self.stdout.write(self.style.SUCCESS(f"Updated streak state on {changed} profile(s)"))
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def backfill_streak_state(apps, schema_editor):
+    # Same computation as authentication.streaks.rebuild_learning_streaks, so
+    # existing users keep their streak instead of reading 0 until their next
+    # activity resets it to 1
+    UserProfile = apps.get_model('authentication', 'UserProfile')
+    StudySession = apps.get_model('user_progress', 'StudySession')
+    TopicProgress = apps.get_model('courses', 'TopicProgress')
+
+    active_days = {}
+    sessions = (
+        StudySession.objects.annotate(day=TruncDate('session_date'))
+        .values_list('user_id', 'day').distinct()
+    )
+    completions = (
+        TopicProgress.objects.filter(completed=True, completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at'))
+        .values_list('user_id', 'day').distinct()
+    )
+    for user_id, day in [*sessions, *completions]:
+        active_days.setdefault(user_id, set()).add(day)
+
+    profiles = list(UserProfile.objects.filter(user_id__in=active_days))
+    for profile in profiles:
+        current = longest = 0
+        previous = None
+        for day in sorted(active_days[profile.user_id]):
+            current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+            longest = max(longest, current)
+            previous = day
+        profile.current_streak = current
+        profile.longest_streak = longest
+        profile.last_active_date = previous
+    UserProfile.objects.bulk_update(
+        profiles, ['current_streak', 'longest_streak', 'last_active_date'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_remove_userprofile_bio_and_more'),
+        ('courses', '0001_initial'),
+        ('user_progress', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='userprofile',
+            old_name='learning_streak',
+            new_name='current_streak',
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='longest_streak',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='last_active_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_streak_state, migrations.RunPython.noop),
+    ]
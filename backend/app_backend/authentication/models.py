@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 import re
 
 class CustomUser(AbstractUser):
@@ -22,7 +23,18 @@ class CustomUser(AbstractUser):
 
 class UserProfile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='profile')
-    learning_streak = models.IntegerField(default=0)
+    # Streak state, advanced by authentication.streaks on each learning activity;
+    # rebuild from history with `manage.py rebuild_learning_streaks`
+    current_streak = models.IntegerField(default=0)
+    longest_streak = models.IntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
     
     def __str__(self):
-        return f"{self.user.username}'s Profile"
\ No newline at end of file
+        return f"{self.user.username}'s Profile"
+
+    @property
+    def learning_streak(self):
+        """Consecutive active days ending today; 0 until the user is active today."""
+        if self.last_active_date != timezone.localdate():
+            return 0
+        return self.current_streak
\ No newline at end of file
@@ -106,7 +106,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = UserProfile
-        fields = ['learning_streak', 'avatar']
+        fields = ['learning_streak', 'longest_streak', 'avatar']
 
 class UserSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+from .models import UserProfile
+
+
+# A learning streak is the run of consecutive days with a study session or a
+# completed topic. Rather than rescanning that history, UserProfile keeps the
+# run's length and its last day, and each activity advances it with a single
+# conditional UPDATE.
+
+
+def record_learning_activity(user, day: Optional[date] = None) -> int:
+    """
+    Count `day` (default today) as active for the user and return the
+    resulting streak. Repeat activity on the same day costs one read.
+    """
+    day = day or timezone.localdate()
+    profile = UserProfile.objects.filter(user=user)
+
+    state = profile.values_list('last_active_date', 'current_streak').first()
+    if state is None:
+        return 0
+    last_active_date, current_streak = state
+    if last_active_date is not None and last_active_date >= day:
+        # Already counted, or an older activity that can't extend the run
+        return current_streak
+
+    # Continue yesterday's run; the last_active_date filter makes a concurrent
+    # request for the same day a no-op instead of a double increment
+    extended = profile.filter(last_active_date=day - timedelta(days=1)).update(
+        current_streak=F('current_streak') + 1,
+        longest_streak=Greatest(F('longest_streak'), F('current_streak') + 1),
+        last_active_date=day,
+    )
+    if not extended:
+        profile.exclude(last_active_date__gte=day).update(
+            current_streak=1,
+            longest_streak=Greatest(F('longest_streak'), Value(1)),
+            last_active_date=day,
+        )
+    return profile.values_list('current_streak', flat=True).first() or 0
+
+
+def record_learning_days(user, days: Iterable[date]) -> int:
+    """
+    Count several days as active at once, e.g. sessions synced from an
+    offline client, and return the resulting streak. Days after the last
+    active day advance the streak one by one as above. An earlier day can
+    lengthen or join past runs, so the streak is then recomputed from the
+    user's DailyActivity rows, which the caller must already have bumped.
+    """
+    days = sorted(set(days))
+    if not days:
+        return get_learning_streak(user)
+    last_active_date = UserProfile.objects.filter(user=user).values_list('last_active_date', flat=True).first()
+    if last_active_date is not None and days[0] < last_active_date:
+        return rebuild_learning_streak(user)
+    streak = 0
+    for day in days:
+        streak = record_learning_activity(user, day)
+    return streak
+
+
+def rebuild_learning_streak(user) -> int:
+    """Recompute one user's streak state from their DailyActivity rows; returns the current streak."""
+    from user_progress.models import DailyActivity
+
+    days = (
+        DailyActivity.objects.filter(user=user)
+        .filter(Q(sessions__gt=0) | Q(topics_completed__gt=0))
+        .values_list('date', flat=True)
+    )
+    state = _streak_state(days)
+    UserProfile.objects.filter(user=user).update(**state)
+    return state['current_streak']
+
+
+def get_learning_streak(user) -> int:
+    """The user's current streak (see UserProfile.learning_streak), without touching activity history."""
+    profile = UserProfile.objects.filter(user=user).only('current_streak', 'last_active_date').first()
+    return profile.learning_streak if profile is not None else 0
+
+
+def _streak_state(days: Iterable[date]) -> Dict:
+    current = longest = 0
+    previous = None
+    for day in sorted(set(days)):
+        current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return {'current_streak': current, 'longest_streak': longest, 'last_active_date': previous}
+
+
+def rebuild_learning_streaks() -> int:
+    """Recompute every profile's streak state from activity history; returns how many profiles changed."""
+    from user_progress.models import StudySession
+    from courses.models import TopicProgress
+
+    active_days: Dict[int, set] = {}
+    sessions = (
+        StudySession.objects.annotate(day=TruncDate('session_date'))
+        .values_list('user_id', 'day').distinct()
+    )
+    completions = (
+        TopicProgress.objects.filter(completed=True, completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at'))
+        .values_list('user_id', 'day').distinct()
+    )
+    for user_id, day in [*sessions, *completions]:
+        active_days.setdefault(user_id, set()).add(day)
+
+    changed = []
+    for profile in UserProfile.objects.all():
+        state = _streak_state(active_days.get(profile.user_id, ()))
+        if any(getattr(profile, field) != value for field, value in state.items()):
+            for field, value in state.items():
+                setattr(profile, field, value)
+            changed.append(profile)
+    UserProfile.objects.bulk_update(changed, ['current_streak', 'longest_streak', 'last_active_date'], batch_size=500)
+    return len(changed)
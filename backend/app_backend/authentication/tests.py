@@ -1,3 +1,96 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from .models import CustomUser, UserProfile
+from .streaks import get_learning_streak, rebuild_learning_streaks, record_learning_activity
 
-# Create your tests here.
+
+class LearningStreakTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='alice', password='pw12345!x')
+        UserProfile.objects.create(user=self.user)
+        self.today = timezone.localdate()
+
+    def state(self):
+        return UserProfile.objects.filter(user=self.user).values_list(
+            'current_streak', 'longest_streak', 'last_active_date'
+        ).get()
+
+    def test_consecutive_days_extend_and_gaps_reset(self):
+        for offset in (5, 4, 3):
+            record_learning_activity(self.user, self.today - timedelta(days=offset))
+        self.assertEqual(self.state(), (3, 3, self.today - timedelta(days=3)))
+        # Repeat activity on the same day, or an older one, changes nothing
+        self.assertEqual(record_learning_activity(self.user, self.today - timedelta(days=3)), 3)
+        self.assertEqual(record_learning_activity(self.user, self.today - timedelta(days=10)), 3)
+
+        self.assertEqual(record_learning_activity(self.user, self.today - timedelta(days=1)), 1)
+        self.assertEqual(record_learning_activity(self.user, self.today), 2)
+        self.assertEqual(self.state(), (2, 3, self.today))
+        self.assertEqual(get_learning_streak(self.user), 2)
+
+    def test_streak_reads_zero_once_a_day_is_missed(self):
+        UserProfile.objects.filter(user=self.user).update(
+            current_streak=4, longest_streak=4, last_active_date=self.today - timedelta(days=2)
+        )
+        self.assertEqual(get_learning_streak(self.user), 0)
+
+    def test_rebuild_from_history(self):
+        from courses.models import Course
+        from user_progress.models import StudySession
+
+        course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        for offset in (0, 1, 2, 6):
+            StudySession.objects.create(
+                user=self.user, course=course, duration_minutes=10,
+                session_date=timezone.now() - timedelta(days=offset),
+            )
+        self.assertEqual(rebuild_learning_streaks(), 1)
+        self.assertEqual(self.state(), (3, 3, self.today))
+        self.assertEqual(rebuild_learning_streaks(), 0)
+
+
+class StreakBackfillMigrationTests(TransactionTestCase):
+    before = [
+        ('authentication', '0002_remove_userprofile_bio_and_more'),
+        ('courses', '0009_quiz_answer_key'),
+        ('user_progress', '0004_daily_activity'),
+    ]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        self.old_apps = executor.loader.project_state(self.before).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_profiles_keep_their_streak(self):
+        User = self.old_apps.get_model('authentication', 'CustomUser')
+        Profile = self.old_apps.get_model('authentication', 'UserProfile')
+        Course = self.old_apps.get_model('courses', 'Course')
+        StudySession = self.old_apps.get_model('user_progress', 'StudySession')
+
+        user = User.objects.create(username='alice', password='x')
+        Profile.objects.create(user=user, learning_streak=3)
+        idle = User.objects.create(username='bob', password='x')
+        Profile.objects.create(user=idle)
+        course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        for offset in (0, 1, 2, 5):
+            session = StudySession.objects.create(user=user, course=course, duration_minutes=10)
+            StudySession.objects.filter(id=session.id).update(session_date=timezone.now() - timedelta(days=offset))
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+        profile = UserProfile.objects.get(user_id=user.id)
+        self.assertEqual(
+            (profile.current_streak, profile.longest_streak, profile.last_active_date),
+            (3, 3, timezone.localdate()),
+        )
+        self.assertEqual(profile.learning_streak, 3)
+        idle_profile = UserProfile.objects.get(user_id=idle.id)
+        self.assertEqual((idle_profile.current_streak, idle_profile.last_active_date), (0, None))
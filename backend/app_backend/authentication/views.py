@@ -4,9 +4,9 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from django.utils import timezone
-from datetime import timedelta
+from django.db.models import Sum
 from .models import CustomUser, UserProfile
+from .streaks import get_learning_streak
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer, 
@@ -16,39 +16,6 @@ from .serializers import (
     ChangePasswordSerializer
 )
 
-def update_user_learning_streak(user):
-    from user_progress.models import StudySession
-    from courses.models import TopicProgress
-
-    learning_streak = 0
-    today = timezone.now().date()
-    current_date = today
-
-    while True:
-        has_study_session = StudySession.objects.filter(
-            user=user,
-            session_date__date=current_date
-        ).exists()
-
-        has_completed_topic = TopicProgress.objects.filter(
-            user=user,
-            completed=True,
-            completed_at__date=current_date
-        ).exists()
-
-        if has_study_session or has_completed_topic:
-            learning_streak += 1
-            current_date -= timedelta(days=1)
-        else:
-            break
-
-    profile = user.profile
-    if profile.learning_streak != learning_streak:
-        profile.learning_streak = learning_streak
-        profile.save()
-
-    return learning_streak
-
 class RegisterAPIView(APIView):
 
     def post(self, request):
@@ -130,40 +97,22 @@ class UserStatsAPIView(APIView):
 
     def get(self, request):
         user = request.user
-        profile = user.profile
 
-        from courses.models import UserCourse, QuizAttempt, TopicProgress
-        from user_progress.models import StudySession
+        from courses.models import UserCourse, TopicProgress
+        from user_progress.models import DailyActivity
 
         total_courses = UserCourse.objects.filter(user=user).count()
         completed_courses = UserCourse.objects.filter(user=user, completed=True).count()
-        total_quizzes = QuizAttempt.objects.filter(user=user).count()
-
-        completed_topics = TopicProgress.objects.filter(
-            user=user, 
-            completed=True
-        ).select_related('topic')
-
-        total_study_time = 0
-        for topic_progress in completed_topics:
-            topic = topic_progress.topic
-            estimated_time = topic.estimated_time
-            if estimated_time:
-                hours = 0
-                if 'hour' in estimated_time.lower():
-                    try:
-                        hours = int(estimated_time.split()[0])
-                    except (ValueError, IndexError):
-                        hours = 1
-                elif 'minute' in estimated_time.lower():
-                    try:
-                        minutes = int(estimated_time.split()[0])
-                        hours = round(minutes / 60)
-                    except (ValueError, IndexError):
-                        hours = 1
-                total_study_time += hours * 60
-
-        learning_streak = update_user_learning_streak(user)
+        # From the daily rollup: one row per active day rather than one per attempt
+        total_quizzes = DailyActivity.objects.filter(user=user).aggregate(
+            total=Sum('quizzes_taken')
+        )['total'] or 0
+
+        total_study_time = TopicProgress.objects.filter(user=user, completed=True).aggregate(
+            total=Sum('topic__estimated_minutes')
+        )['total'] or 0
+
+        learning_streak = get_learning_streak(user)
 
         return Response({
             'total_courses': total_courses,
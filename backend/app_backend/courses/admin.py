@@ -1,11 +1,34 @@
+from django import forms
 from django.contrib import admin
-from .models import Course, Topic, Quiz, UserCourse, TopicProgress, QuizAttempt
+from .models import Course, Topic, Quiz, UserCourse, TopicProgress, QuizAttempt, CourseGenerationJob
 
 # Register your models here.
 
 admin.site.register(Course)
-admin.site.register(Topic)
+
+class TopicAdminForm(forms.ModelForm):
+    # Notes are stored compressed; edit them as text through the model property
+    notes = forms.CharField(widget=forms.Textarea, required=False)
+
+    class Meta:
+        model = Topic
+        exclude = ['notes_gz', 'estimated_minutes']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['notes'].initial = self.instance.notes
+
+    def save(self, commit=True):
+        self.instance.notes = self.cleaned_data['notes']
+        return super().save(commit)
+
+@admin.register(Topic)
+class TopicAdmin(admin.ModelAdmin):
+    form = TopicAdminForm
+
 admin.site.register(Quiz)
 admin.site.register(UserCourse)
 admin.site.register(TopicProgress)
-admin.site.register(QuizAttempt)
\ No newline at end of file
+admin.site.register(QuizAttempt)
+admin.site.register(CourseGenerationJob)
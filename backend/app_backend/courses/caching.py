@@ -0,0 +1,58 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+# Generated course content is effectively immutable: any change to a course,
+# its topics or quizzes bumps Course.updated_at (see courses.signals), so
+# keys that embed updated_at never need explicit invalidation; stale
+# versions simply age out of the cache.
+
+
+def content_key(kind, obj_id, updated_at, request=None, encoding=''):
+    """Cache key for one representation of a piece of course content."""
+    variant = encoding
+    if request is not None:
+        params = request.query_params
+        variant += f"|{params.get('fields', '')}|{params.get('expand', '')}"
+        variant += f"|{params.get('cursor', '')}|{params.get('page_size', '')}"
+    return f"courses:{kind}:{obj_id}:{updated_at.timestamp()}:{variant}"
+
+
+def content_etag(key):
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def get_or_build(key, build):
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, settings.COURSE_CONTENT_CACHE_TIMEOUT)
+    return payload
+
+
+def conditional_content_response(request, key, updated_at, build, paginator=None):
+    """
+    Serve cached content with a strong ETag and Last-Modified.
+
+    The ETag is derived from the cache key (kind, id, version, field
+    selection), so a revalidating client gets its 304 before the payload is
+    even looked up. With a paginator only the page's results are cached; the
+    next/previous links are added per request.
+    """
+    etag = content_etag(key)
+    last_modified = int(updated_at.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        payload = get_or_build(key, build)
+        response = paginator.get_paginated_response(payload) if paginator else Response(payload)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Always revalidate; unchanged content costs a 304
+    response['Cache-Control'] = 'no-cache'
+    return response
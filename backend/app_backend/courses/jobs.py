@@ -0,0 +1,420 @@
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, Optional, Set, Tuple
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Course, Topic, Quiz, UserCourse, CourseGenerationJob
+from .serializers import CourseSerializer, TopicOutlineSerializer, CourseGenerationJobSerializer
+from ai_integration.services import AIService
+
+
+# Local worker pool shared by every request handled in this process. Jobs are
+# always claimed through the database, so the `run_generation_worker` command
+# can drain the same queue from a separate process. Besides the jobs this
+# process enqueues, a poller thread hands the pool pending jobs it finds in
+# the table, so jobs queued before a restart are not stranded.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Job ids handed to the pool and not yet finished
+_submitted: Set[int] = set()
+_poller: Optional[threading.Thread] = None
+
+
+def _get_executor() -> Optional[ThreadPoolExecutor]:
+    global _executor
+    if settings.COURSE_GENERATION_WORKERS <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.COURSE_GENERATION_WORKERS,
+                    thread_name_prefix='course-generation',
+                )
+    return _executor
+
+
+def enqueue_generation_job(job: CourseGenerationJob) -> None:
+    """Hand a pending job to the in-process pool once the surrounding transaction commits."""
+    executor = _get_executor()
+    if executor is None:
+        return
+    start_generation_poller()
+    transaction.on_commit(lambda: _submit(executor, job.id))
+
+
+def _submit(executor: ThreadPoolExecutor, job_id: int) -> bool:
+    with _executor_lock:
+        if job_id in _submitted:
+            return False
+        _submitted.add(job_id)
+    executor.submit(_run_submitted_job, job_id)
+    return True
+
+
+def _run_submitted_job(job_id: int) -> None:
+    try:
+        run_generation_job_in_thread(job_id)
+    finally:
+        with _executor_lock:
+            _submitted.discard(job_id)
+
+
+def run_generation_job_in_thread(job_id: int) -> None:
+    close_old_connections()
+    try:
+        run_generation_job(job_id)
+    finally:
+        connection.close()
+
+
+def claim_pending_jobs() -> int:
+    """
+    Hand the in-process pool the oldest pending jobs it has room for;
+    returns how many were submitted.
+    """
+    executor = _get_executor()
+    if executor is None:
+        return 0
+    expire_stale_jobs()
+    with _executor_lock:
+        in_flight = set(_submitted)
+    room = settings.COURSE_GENERATION_WORKERS - len(in_flight)
+    if room <= 0:
+        return 0
+    job_ids = (
+        CourseGenerationJob.objects.filter(status='pending')
+        .exclude(id__in=in_flight)
+        .order_by('created_at')
+        .values_list('id', flat=True)[:room]
+    )
+    return sum(_submit(executor, job_id) for job_id in job_ids)
+
+
+def start_generation_poller() -> None:
+    """Start polling the job table from this process; safe to call repeatedly."""
+    global _poller
+    if _poller is not None or settings.COURSE_GENERATION_POLL_SECONDS <= 0 or _get_executor() is None:
+        return
+    with _executor_lock:
+        if _poller is None:
+            _poller = threading.Thread(target=_poll_loop, name='course-generation-poll', daemon=True)
+            _poller.start()
+
+
+def _poll_loop() -> None:
+    while True:
+        try:
+            claim_pending_jobs()
+        except Exception as e:
+            print(f"Course generation queue poll failed: {str(e)}")
+        finally:
+            connection.close()
+        time.sleep(settings.COURSE_GENERATION_POLL_SECONDS)
+
+
+def _lease_expiry():
+    return timezone.now() + timedelta(seconds=settings.COURSE_GENERATION_LEASE_SECONDS)
+
+
+def start_or_join_generation(user, course_name: str, difficulty: str, duration_weeks: int,
+                             **job_fields) -> Tuple[CourseGenerationJob, bool]:
+    """
+    Single-flight entry point for course generation.
+
+    Returns (job, created). If an identical request (same normalized course
+    name, difficulty and duration) is already pending or running, the caller
+    is subscribed to that job instead of starting another one, and is enrolled
+    in its course when it completes. The partial unique constraint on active
+    jobs makes the database the arbiter when two requests race.
+    """
+    dedupe_key = CourseGenerationJob.make_dedupe_key(course_name, difficulty, duration_weeks)
+
+    for _ in range(3):
+        active = (
+            CourseGenerationJob.objects
+            .filter(dedupe_key=dedupe_key, status__in=CourseGenerationJob.ACTIVE_STATUSES)
+            .first()
+        )
+        if active is not None:
+            if _lease_lapsed(active):
+                expire_stale_jobs(dedupe_key=dedupe_key)
+                continue
+            _subscribe(active, user)
+            return active, False
+
+        # Pending jobs get a lease too: one whose submission was lost must not
+        # hold its key forever. Claiming the job renews it.
+        job_fields.setdefault('lease_expires_at', _lease_expiry())
+        try:
+            with transaction.atomic():
+                job = CourseGenerationJob.objects.create(
+                    user=user,
+                    course_name=course_name,
+                    difficulty=difficulty,
+                    duration_weeks=duration_weeks,
+                    dedupe_key=dedupe_key,
+                    **job_fields
+                )
+            return job, True
+        except IntegrityError:
+            # Lost the race to an identical request; join the winner
+            continue
+
+    raise RuntimeError(f"Could not start or join a generation job for {dedupe_key!r}")
+
+
+def _subscribe(job: CourseGenerationJob, user) -> None:
+    if job.user_id == user.id:
+        return
+
+    # Serialized with _finish_job through the job row lock: either the finisher
+    # sees this subscription, or we see the completed job and enroll ourselves.
+    # The subscription is written before the lock is taken so SQLite never has
+    # to upgrade a read transaction to a write one.
+    with transaction.atomic():
+        job.subscribers.add(user)
+        locked = CourseGenerationJob.objects.select_for_update().get(id=job.id)
+        if locked.status == 'completed' and locked.course_id:
+            UserCourse.objects.get_or_create(user=user, course_id=locked.course_id)
+    job.status, job.course_id = locked.status, locked.course_id
+
+
+def _lease_lapsed(job: CourseGenerationJob) -> bool:
+    now = timezone.now()
+    if job.lease_expires_at is not None:
+        return job.lease_expires_at < now
+    return job.status == 'pending' and job.created_at < now - timedelta(seconds=settings.COURSE_GENERATION_LEASE_SECONDS)
+
+
+def _stale_jobs():
+    # Same test as _lease_lapsed, as a queryset
+    now = timezone.now()
+    return CourseGenerationJob.objects.filter(status__in=CourseGenerationJob.ACTIVE_STATUSES).filter(
+        Q(lease_expires_at__lt=now)
+        # Pending jobs queued before they were given a lease
+        | Q(status='pending', lease_expires_at__isnull=True,
+            created_at__lt=now - timedelta(seconds=settings.COURSE_GENERATION_LEASE_SECONDS))
+    )
+
+
+def expire_stale_jobs(dedupe_key: Optional[str] = None) -> int:
+    """
+    Fail active jobs whose lease ran out: running jobs that stopped reporting
+    progress and pending jobs nobody claimed. Frees their key for a new attempt.
+    """
+    stale = _stale_jobs()
+    if dedupe_key is not None:
+        stale = stale.filter(dedupe_key=dedupe_key)
+    return stale.update(
+        status='failed',
+        error='Generation stopped responding and was abandoned.',
+        finished_at=timezone.now(),
+    )
+
+
+def claim_job(job_id: int) -> bool:
+    """Atomically move a job from pending to running; False if someone else got it."""
+    return CourseGenerationJob.objects.filter(id=job_id, status='pending').update(
+        status='running', started_at=timezone.now(), lease_expires_at=_lease_expiry()
+    ) == 1
+
+
+class JobLeaseLost(Exception):
+    """The job was expired (and maybe retried) while this worker was still running it."""
+
+
+def run_generation_job(job_id: int) -> None:
+    if not claim_job(job_id):
+        return
+
+    job = CourseGenerationJob.objects.select_related('user').get(id=job_id)
+    try:
+        generate_course_for_job(job)
+    except JobLeaseLost:
+        print(f"Course generation job {job.id} lost its lease; result dropped")
+    except Exception as e:
+        print(f"Course generation error for job {job.id}: {str(e)}")
+        _fail_job(job, 'AI service is currently experiencing issues.')
+
+
+def _update_job(job: CourseGenerationJob, **fields) -> None:
+    """
+    Write fields of a running job. Raises JobLeaseLost if the job is no
+    longer running, e.g. expire_stale_jobs failed it and a retry took over,
+    so a late worker can neither revive it nor complete it.
+    """
+    if fields.get('status', 'running') == 'running':
+        # Every progress update doubles as a heartbeat
+        fields['lease_expires_at'] = _lease_expiry()
+    if not CourseGenerationJob.objects.filter(id=job.id, status='running').update(**fields):
+        raise JobLeaseLost(f"Generation job {job.id} is no longer running")
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def generate_course_for_job(job: CourseGenerationJob) -> Course:
+    """Run the roadmap + quiz pipeline for a job and enroll its owner in the result."""
+    course_name = job.course_name
+    ai_service = AIService()
+
+    _update_job(job, stage='roadmap')
+    course_data = ai_service.generate_course_roadmap(course_name, job.difficulty, job.duration_weeks)
+    is_fallback_data = course_data.get('description', '').startswith(
+        f'Master {course_name} with our AI-curated learning path'
+    )
+
+    topics = course_data.get('topics', [])
+    _update_job(job, stage='quizzes', topics_total=len(topics), is_fallback=is_fallback_data)
+    quizzes = ai_service.generate_quizzes(
+        [t['title'] for t in topics],
+        course_name,
+        on_progress=lambda done: _update_job(job, topics_done=done),
+    )
+
+    _update_job(job, stage='saving')
+    with transaction.atomic():
+        course = Course.objects.create(
+            title=course_name,
+            description=course_data.get('description', f'Master {course_name} with our AI-curated learning path.'),
+            difficulty=job.difficulty,
+            estimated_duration=f"{job.duration_weeks} weeks"
+        )
+
+        for i, (topic_data, quiz_questions) in enumerate(zip(topics, quizzes)):
+            topic = _create_topic(course, i + 1, topic_data)
+            Quiz.objects.create(topic=topic, questions=quiz_questions)
+
+        _finish_job(job, course)
+
+    return course
+
+
+def stream_generation_job(job: CourseGenerationJob) -> Iterator[Tuple[str, Dict]]:
+    """
+    Run an already-claimed job inline, yielding (event, data) pairs for the client.
+
+    The course row is created as soon as the roadmap stream starts and each
+    topic is saved the moment its JSON object is complete. Quizzes for saved
+    topics are generated in the background while the roadmap keeps streaming.
+    If the stream stops early the partial course is deleted again.
+    """
+    course_name = job.course_name
+    ai_service = AIService()
+    course = None
+    quiz_futures = {}
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, ai_service.quiz_concurrency), thread_name_prefix='gemini-quiz'
+    )
+
+    try:
+        _update_job(job, stage='roadmap')
+        for kind, value in ai_service.stream_course_roadmap(course_name, job.difficulty, job.duration_weeks):
+            if course is None:
+                course = Course.objects.create(
+                    title=course_name,
+                    description=value if kind == 'description' else f'Master {course_name} with our AI-curated learning path.',
+                    difficulty=job.difficulty,
+                    estimated_duration=f"{job.duration_weeks} weeks"
+                )
+                _update_job(job, course=course)
+                yield 'course', CourseSerializer(course).data
+            elif kind == 'description':
+                course.description = value
+                course.save(update_fields=['description', 'updated_at'])
+
+            if kind == 'topic':
+                topic = _create_topic(course, len(quiz_futures) + 1, value)
+                future = executor.submit(ai_service.generate_quiz, topic.title, course_name)
+                quiz_futures[future] = topic
+                _update_job(job, topics_total=len(quiz_futures))
+                yield 'topic', TopicOutlineSerializer(topic).data
+
+        _update_job(
+            job,
+            stage='quizzes',
+            is_fallback=course.description.startswith(f'Master {course_name} with our AI-curated learning path'),
+        )
+        for done, future in enumerate(as_completed(quiz_futures), start=1):
+            Quiz.objects.create(topic=quiz_futures[future], questions=future.result())
+            _update_job(job, topics_done=done)
+            yield 'progress', {'topics_done': done, 'topics_total': len(quiz_futures)}
+
+        _finish_job(job, course)
+
+    except GeneratorExit:
+        _fail_job(job, 'Client disconnected before generation finished.')
+        _discard_partial_course(course)
+        raise
+    except Exception as e:
+        print(f"Streaming course generation error for job {job.id}: {str(e)}")
+        _fail_job(job, 'AI service is currently experiencing issues.')
+        _discard_partial_course(course)
+        yield 'error', {
+            'error': 'Error generating course. Please try again later.',
+            'details': 'AI service is currently experiencing issues.'
+        }
+        return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Outside the try: the course is finished and handed out, so a client
+    # leaving during this last event must not trigger the cleanup above
+    yield 'complete', CourseGenerationJobSerializer(job).data
+
+
+def _create_topic(course: Course, order: int, topic_data: Dict) -> Topic:
+    topic = Topic.objects.create(
+        course=course,
+        title=topic_data['title'],
+        description=topic_data['description'],
+        order=order,
+        notes=topic_data['notes'],
+        estimated_time=topic_data.get('estimated_time', '')
+    )
+    return topic
+
+
+def _finish_job(job: CourseGenerationJob, course: Course) -> None:
+    # topic_count was bumped with F() updates by the Topic signals; load the real value
+    course.refresh_from_db(fields=['topic_count'])
+    with transaction.atomic():
+        # The status update locks the job row, so concurrent subscriptions are
+        # either visible below or see the completed job and enroll themselves
+        # (see _subscribe).
+        _update_job(
+            job,
+            status='completed',
+            stage='done',
+            course=course,
+            finished_at=timezone.now(),
+        )
+        user_ids = {job.user_id, *job.subscribers.values_list('id', flat=True)}
+        UserCourse.objects.bulk_create(
+            [UserCourse(user_id=user_id, course=course) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+
+
+def _fail_job(job: CourseGenerationJob, error: str) -> None:
+    try:
+        _update_job(job, status='failed', error=error, finished_at=timezone.now())
+    except JobLeaseLost:
+        # Already failed by expire_stale_jobs
+        pass
+
+
+def _discard_partial_course(course: Optional[Course]) -> None:
+    # A stream that stops early leaves a course without all of its topics or
+    # quizzes; remove it (topics and quizzes cascade) so the next request for
+    # the same title generates it again
+    if course is None:
+        return
+    try:
+        course.delete()
+    except Exception as e:
+        print(f"Could not remove partial course {course.id}: {str(e)}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from courses.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index over courses, topics and topic notes.'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING(
+                'Full-text search tables are not available on this database; search uses the icontains fallback.'
+            ))
+            return
+        written = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} course and topic row(s)"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from courses.progress import recount_progress_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute Course.topic_count and UserCourse progress counters from topics and topic progress.'
+
+    def handle(self, *args, **options):
+        fixed = recount_progress_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"Repaired {fixed['courses']} course topic count(s) and {fixed['enrollments']} enrollment counter(s)"
+        ))
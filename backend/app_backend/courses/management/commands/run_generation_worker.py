@@ -0,0 +1,37 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from courses.jobs import expire_stale_jobs, run_generation_job_in_thread
+from courses.models import CourseGenerationJob
+
+
+class Command(BaseCommand):
+    help = 'Process pending course generation jobs from the database queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Jobs processed concurrently.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue polls.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(f"Course generation worker started with {workers} worker(s)")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='course-generation') as executor:
+            while True:
+                expired = expire_stale_jobs()
+                if expired:
+                    self.stdout.write(f"Abandoned {expired} stale job(s)")
+
+                job_ids = list(
+                    CourseGenerationJob.objects.filter(status='pending')
+                    .order_by('created_at')
+                    .values_list('id', flat=True)[:workers]
+                )
+                # Each job is claimed atomically, so racing with the web process is harmless
+                list(executor.map(run_generation_job_in_thread, job_ids))
+
+                if options['once'] and not job_ids:
+                    break
+                if not job_ids:
+                    time.sleep(options['poll_interval'])
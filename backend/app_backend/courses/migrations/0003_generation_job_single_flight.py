@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_dedupe_keys(apps, schema_editor):
+    CourseGenerationJob = apps.get_model('courses', 'CourseGenerationJob')
+    seen = set()
+    for job in CourseGenerationJob.objects.order_by('created_at'):
+        job.dedupe_key = f"{' '.join(job.course_name.split()).casefold()}|{job.difficulty}|{job.duration_weeks}"
+        fields = ['dedupe_key']
+        if job.status in ('pending', 'running'):
+            if job.dedupe_key in seen:
+                # Only one active job per key may survive the new constraint
+                job.status = 'failed'
+                job.error = 'Superseded by an identical generation request.'
+                fields += ['status', 'error']
+            seen.add(job.dedupe_key)
+        job.save(update_fields=fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_coursegenerationjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursegenerationjob',
+            name='dedupe_key',
+            field=models.CharField(db_index=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='coursegenerationjob',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coursegenerationjob',
+            name='subscribers',
+            field=models.ManyToManyField(blank=True, related_name='subscribed_generation_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_dedupe_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='coursegenerationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('dedupe_key',), name='unique_active_generation_job'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+import re
+
+from django.db import migrations, models
+
+
+# Frozen copy of courses.models.parse_estimated_minutes, so the backfill
+# gives existing topics the same minutes Topic.save() gives new ones
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-\s*\d+(?:\.\d+)?\s*)?(hours?|hrs?|h\b|minutes?|mins?|m\b)", re.IGNORECASE)
+
+
+def parse_estimated_minutes(estimated_time):
+    if not estimated_time:
+        return 0
+    minutes = 0.0
+    matched = False
+    for match in _DURATION.finditer(estimated_time):
+        matched = True
+        value = float(match.group(1))
+        minutes += value * 60 if match.group(2).lower().startswith('h') else value
+    if matched:
+        return round(minutes)
+    lowered = estimated_time.lower()
+    if 'hour' in lowered or 'minute' in lowered:
+        return 60
+    return 0
+
+
+def backfill_estimated_minutes(apps, schema_editor):
+    Topic = apps.get_model('courses', 'Topic')
+    topics = list(Topic.objects.only('id', 'estimated_time'))
+    for topic in topics:
+        topic.estimated_minutes = parse_estimated_minutes(topic.estimated_time)
+    Topic.objects.bulk_update(topics, ['estimated_minutes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_generation_job_single_flight'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='estimated_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_estimated_minutes, migrations.RunPython.noop),
+    ]
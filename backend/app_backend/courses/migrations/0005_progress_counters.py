@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:05
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least, NullIf
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Topic = apps.get_model('courses', 'Topic')
+    UserCourse = apps.get_model('courses', 'UserCourse')
+    TopicProgress = apps.get_model('courses', 'TopicProgress')
+
+    Course.objects.update(topic_count=Coalesce(Subquery(
+        Topic.objects.filter(course=OuterRef('pk')).values('course').annotate(total=Count('id')).values('total'),
+        output_field=IntegerField(),
+    ), 0))
+    UserCourse.objects.update(completed_topics=Coalesce(Subquery(
+        TopicProgress.objects.filter(user=OuterRef('user'), topic__course=OuterRef('course'), completed=True)
+        .values('user').annotate(total=Count('id')).values('total'),
+        output_field=IntegerField(),
+    ), 0))
+    course_topics = Subquery(
+        Course.objects.filter(pk=OuterRef('course')).values('topic_count'), output_field=IntegerField()
+    )
+    UserCourse.objects.update(progress_percentage=Coalesce(
+        Least(F('completed_topics') * 100 / NullIf(course_topics, 0), Value(100)), 0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_topic_estimated_minutes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='topic_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usercourse',
+            name='completed_topics',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
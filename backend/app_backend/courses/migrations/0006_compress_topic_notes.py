@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:08
+
+import gzip
+
+from django.db import migrations, models
+
+
+def compress_notes(apps, schema_editor):
+    Topic = apps.get_model('courses', 'Topic')
+    for topic in Topic.objects.only('id', 'notes').iterator(chunk_size=200):
+        topic.notes_gz = gzip.compress(topic.notes.encode('utf-8'), compresslevel=6, mtime=0)
+        topic.save(update_fields=['notes_gz'])
+
+
+def decompress_notes(apps, schema_editor):
+    Topic = apps.get_model('courses', 'Topic')
+    for topic in Topic.objects.only('id', 'notes_gz').iterator(chunk_size=200):
+        topic.notes = gzip.decompress(bytes(topic.notes_gz)).decode('utf-8') if topic.notes_gz else ''
+        topic.save(update_fields=['notes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='notes_gz',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(compress_notes, decompress_notes),
+        # A default lets the column be re-added on existing rows when unapplying
+        migrations.AlterField(
+            model_name='topic',
+            name='notes',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='notes',
+        ),
+    ]
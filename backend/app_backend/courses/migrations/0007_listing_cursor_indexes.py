@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_compress_topic_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['created_at', 'id'], name='courses_cou_created_7ad857_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercourse',
+            index=models.Index(fields=['user', '-enrolled_at', '-id'], name='courses_use_user_id_5c8a69_idx'),
+        ),
+    ]
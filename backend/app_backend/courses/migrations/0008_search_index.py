@@ -0,0 +1,55 @@
+import gzip
+
+from django.db import OperationalError, migrations, transaction
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends use the icontains fallback in courses.search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Topic = apps.get_model('courses', 'Topic')
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            with transaction.atomic():
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE courses_search_course USING fts5("
+                    "title, description, tokenize='porter unicode61')"
+                )
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE courses_search_topic USING fts5("
+                    "title, description, notes, course_id UNINDEXED, tokenize='porter unicode61')"
+                )
+        except OperationalError:
+            # SQLite built without FTS5
+            return
+
+        cursor.execute(
+            "INSERT INTO courses_search_course (rowid, title, description) "
+            "SELECT id, title, description FROM courses_course"
+        )
+        for topic in Topic.objects.only('id', 'course_id', 'title', 'description', 'notes_gz').iterator(chunk_size=200):
+            notes = gzip.decompress(bytes(topic.notes_gz)).decode('utf-8') if topic.notes_gz else ''
+            cursor.execute(
+                "INSERT INTO courses_search_topic (rowid, title, description, notes, course_id) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [topic.id, topic.title, topic.description, notes, topic.course_id],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS courses_search_topic")
+        cursor.execute("DROP TABLE IF EXISTS courses_search_course")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_listing_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
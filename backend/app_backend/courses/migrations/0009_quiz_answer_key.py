@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:16
+
+from django.db import migrations, models
+
+
+# Frozen copies of courses.models.compile_quiz and is_fallback_quiz as of
+# this migration; later changes to the live helpers must not change it
+
+
+def compile_quiz(questions):
+    answer_key, explanations, student_questions = [], [], []
+    for question in questions if isinstance(questions, list) else []:
+        if not isinstance(question, dict):
+            question = {}
+        answer = question.get('correct_answer')
+        answer_key.append(answer if isinstance(answer, int) and not isinstance(answer, bool) else None)
+        explanations.append(question.get('explanation', ''))
+        student_questions.append({
+            key: value for key, value in question.items() if key not in ('correct_answer', 'explanation')
+        })
+    return answer_key, explanations, student_questions
+
+
+def is_fallback_quiz(questions):
+    if not questions or not isinstance(questions, list) or not isinstance(questions[0], dict):
+        return False
+    first = questions[0]
+    return (
+        'main purpose of' in str(first.get('question', '')).lower() and
+        'fundamental concept' in str(first.get('explanation', '')).lower()
+    )
+
+
+def compile_existing_quizzes(apps, schema_editor):
+    Quiz = apps.get_model('courses', 'Quiz')
+    quizzes = list(Quiz.objects.only('id', 'questions'))
+    for quiz in quizzes:
+        quiz.answer_key, quiz.explanations, quiz.student_questions = compile_quiz(quiz.questions)
+        quiz.is_fallback = is_fallback_quiz(quiz.questions)
+    Quiz.objects.bulk_update(
+        quizzes, ['answer_key', 'explanations', 'student_questions', 'is_fallback'], batch_size=200
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='answer_key',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='explanations',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='is_fallback',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='student_questions',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(compile_existing_quizzes, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,40 @@
+import gzip
+import re
 from django.db import models
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-\s*\d+(?:\.\d+)?\s*)?(hours?|hrs?|h\b|minutes?|mins?|m\b)", re.IGNORECASE)
+
+def parse_estimated_minutes(estimated_time):
+    """
+    Minutes in a free-text duration such as "2 hours", "1 hour 30 minutes" or
+    "1.5-2 hrs" (ranges use their lower bound). Text that mentions a unit but
+    has no usable number counts as an hour; anything else counts as zero.
+    """
+    if not estimated_time:
+        return 0
+    minutes = 0.0
+    matched = False
+    for match in _DURATION.finditer(estimated_time):
+        matched = True
+        value = float(match.group(1))
+        minutes += value * 60 if match.group(2).lower().startswith('h') else value
+    if matched:
+        return round(minutes)
+    lowered = estimated_time.lower()
+    if 'hour' in lowered or 'minute' in lowered:
+        return 60
+    return 0
+
+def compress_notes(text):
+    # mtime=0 keeps the output (and anything hashed from it) deterministic
+    return gzip.compress((text or '').encode('utf-8'), compresslevel=6, mtime=0)
+
+def decompress_notes(data):
+    return gzip.decompress(bytes(data)).decode('utf-8') if data else ''
+
 class Course(models.Model):
     DIFFICULTY_CHOICES = [
         ('beginner', 'Beginner'),
@@ -14,9 +46,17 @@ class Course(models.Model):
     description = models.TextField()
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES)
     estimated_duration = models.CharField(max_length=50)
+    # Maintained by courses.progress; repair with `manage.py recount_course_progress`
+    topic_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Cursor pagination of the featured listing (courses.pagination)
+            models.Index(fields=['created_at', 'id']),
+        ]
+    
     def __str__(self):
         return self.title + " - " + self.difficulty + " - " + self.estimated_duration
 
@@ -25,8 +65,12 @@ class Topic(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     order = models.IntegerField()
-    notes = models.TextField()
+    # gzip-compressed Markdown notes; read and write them through `notes`.
+    # Clients accepting gzip get these bytes as-is (TopicNotesRawAPIView).
+    notes_gz = models.BinaryField(default=b'')
     estimated_time = models.CharField(max_length=20)
+    # Derived from estimated_time on save so study time can be summed in SQL
+    estimated_minutes = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['order']
@@ -34,14 +78,74 @@ class Topic(models.Model):
     def __str__(self):
         return f"{self.course.title} - {self.title}"
 
+    @property
+    def notes(self):
+        return decompress_notes(self.notes_gz)
+
+    @notes.setter
+    def notes(self, value):
+        self.notes_gz = compress_notes(value)
+
+    def save(self, *args, **kwargs):
+        self.estimated_minutes = parse_estimated_minutes(self.estimated_time)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'estimated_time' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'estimated_minutes'}
+        super().save(*args, **kwargs)
+
+def compile_quiz(questions):
+    """
+    Split AI-generated questions into what grading, review and students need:
+    (answer_key, explanations, student_questions). The key holds each
+    question's correct option index, or None when the question has no usable
+    answer; student questions have the answer and explanation stripped.
+    """
+    answer_key, explanations, student_questions = [], [], []
+    for question in questions if isinstance(questions, list) else []:
+        if not isinstance(question, dict):
+            question = {}
+        answer = question.get('correct_answer')
+        answer_key.append(answer if isinstance(answer, int) and not isinstance(answer, bool) else None)
+        explanations.append(question.get('explanation', ''))
+        student_questions.append({
+            key: value for key, value in question.items() if key not in ('correct_answer', 'explanation')
+        })
+    return answer_key, explanations, student_questions
+
+def is_fallback_quiz(questions):
+    # AIService._get_fallback_quiz output, recognised by its first question
+    if not questions or not isinstance(questions, list) or not isinstance(questions[0], dict):
+        return False
+    first = questions[0]
+    return (
+        'main purpose of' in str(first.get('question', '')).lower() and
+        'fundamental concept' in str(first.get('explanation', '')).lower()
+    )
+
 class Quiz(models.Model):
     topic = models.OneToOneField(Topic, on_delete=models.CASCADE, related_name='quiz')
     questions = models.JSONField()  # Store AI-generated questions as JSON
+    # Derived from questions on save (see compile_quiz); grading reads only
+    # answer_key and students are only ever sent student_questions
+    answer_key = models.JSONField(default=list)
+    explanations = models.JSONField(default=list)
+    student_questions = models.JSONField(default=list)
+    is_fallback = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Quiz for {self.topic.course.title} - {self.topic.title}"
 
+    def save(self, *args, **kwargs):
+        self.answer_key, self.explanations, self.student_questions = compile_quiz(self.questions)
+        self.is_fallback = is_fallback_quiz(self.questions)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'questions' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'answer_key', 'explanations', 'student_questions', 'is_fallback'
+            }
+        super().save(*args, **kwargs)
+
 class UserCourse(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -49,9 +153,15 @@ class UserCourse(models.Model):
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     progress_percentage = models.IntegerField(default=0)
+    # Topics of the course this user has completed, bumped on first completion
+    completed_topics = models.PositiveIntegerField(default=0)
     
     class Meta:
         unique_together = ['user', 'course']
+        indexes = [
+            # Cursor pagination of a user's enrollments (courses.pagination)
+            models.Index(fields=['user', '-enrolled_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.course.title}"
@@ -79,4 +189,61 @@ class QuizAttempt(models.Model):
     completed_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"{self.user.username} - {self.quiz.topic.course.title} - {self.quiz.topic.title} - {self.score}/{self.total_questions}"
\ No newline at end of file
+        return f"{self.user.username} - {self.quiz.topic.course.title} - {self.quiz.topic.title} - {self.score}/{self.total_questions}"
+
+class CourseGenerationJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    STAGE_CHOICES = [
+        ('queued', 'Queued'),
+        ('roadmap', 'Generating roadmap'),
+        ('quizzes', 'Generating quizzes'),
+        ('saving', 'Saving course'),
+        ('done', 'Done'),
+    ]
+
+    ACTIVE_STATUSES = ['pending', 'running']
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generation_jobs')
+    # Users who asked for the same course while this job was in flight
+    subscribers = models.ManyToManyField(User, blank=True, related_name='subscribed_generation_jobs')
+    course_name = models.CharField(max_length=200)
+    # Normalized (course name, difficulty, duration); at most one active job per key
+    dedupe_key = models.CharField(max_length=255, db_index=True, default='')
+    difficulty = models.CharField(max_length=20, choices=Course.DIFFICULTY_CHOICES)
+    duration_weeks = models.IntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='queued')
+    topics_total = models.IntegerField(default=0)
+    topics_done = models.IntegerField(default=0)
+    course = models.ForeignKey(Course, null=True, blank=True, on_delete=models.SET_NULL, related_name='generation_jobs')
+    is_fallback = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Renewed on every progress update; an active job past its lease is considered dead
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='unique_active_generation_job',
+            ),
+        ]
+
+    @staticmethod
+    def make_dedupe_key(course_name, difficulty, duration_weeks):
+        return f"{' '.join(course_name.split()).casefold()}|{difficulty}|{duration_weeks}"
+
+    def __str__(self):
+        return f"{self.user.username} - {self.course_name} - {self.status}"
@@ -0,0 +1,33 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+# Keyset pagination for course listings: each page is a range scan from the
+# cursor's position on an indexed column, so the cost of fetching page N does
+# not grow with N the way LIMIT/OFFSET does. The trailing id breaks ties
+# between rows created in the same instant.
+
+
+class EnrollmentCursorPagination(CursorPagination):
+    """Newest enrollments first; backed by the (user, -enrolled_at) index on UserCourse."""
+    ordering = ('-enrolled_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class FeaturedCourseCursorPagination(CursorPagination):
+    """Oldest courses first, four to a page by default; backed by the created_at index on Course."""
+    ordering = ('created_at', 'id')
+    page_size = 4
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class SearchResultsPagination(PageNumberPagination):
+    """
+    Search results are ordered by relevance, which has no stable key to
+    page on; they are capped at courses.search.MAX_RESULTS ids, so page
+    numbers over that list stay cheap.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
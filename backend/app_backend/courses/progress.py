@@ -0,0 +1,119 @@
+from typing import Dict, Iterable, NamedTuple, Optional
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least, NullIf
+from django.utils import timezone
+from .models import Course, Topic, UserCourse, TopicProgress
+
+
+# Denormalized counters: Course.topic_count and UserCourse.completed_topics /
+# progress_percentage / completed. They are only ever changed with single
+# UPDATE statements so concurrent quiz submissions can't overwrite each other.
+# Course.topic_count follows Topic inserts and deletes through courses.signals,
+# whichever code path (generation, admin, shell) adds or removes the topic.
+
+
+def add_topic_to_course(course_id: int) -> None:
+    Course.objects.filter(id=course_id).update(topic_count=F('topic_count') + 1)
+
+
+class QuizProgress(NamedTuple):
+    first_completion: bool = False
+    course_completed: bool = False
+
+
+def record_quiz_result(user, topic: Topic, passed: bool) -> QuizProgress:
+    """
+    Mark a topic's quiz as taken (and the topic completed if passed) and
+    advance the user's course counters. Costs the same handful of queries
+    whatever the course size. Reports whether this was the topic's first
+    completion and whether it completed the course.
+    """
+    progress, _ = TopicProgress.objects.get_or_create(user=user, topic=topic)
+    user_course, _ = UserCourse.objects.get_or_create(user=user, course_id=topic.course_id)
+
+    if passed:
+        now = timezone.now()
+        with transaction.atomic():
+            # Only the request that flips completed=False -> True counts the topic
+            first_completion = TopicProgress.objects.filter(id=progress.id, completed=False).update(
+                completed=True, completed_at=now, quiz_completed=True
+            ) == 1
+            if first_completion:
+                topic_count = max(topic.course.topic_count, 1)
+                enrollment = UserCourse.objects.filter(id=user_course.id)
+                enrollment.update(
+                    completed_topics=F('completed_topics') + 1,
+                    progress_percentage=Least((F('completed_topics') + 1) * 100 / topic_count, Value(100)),
+                )
+                course_completed = enrollment.filter(completed=False, completed_topics__gte=topic_count).update(
+                    completed=True, completed_at=now
+                ) == 1
+                return QuizProgress(first_completion=True, course_completed=course_completed)
+
+    TopicProgress.objects.filter(id=progress.id, quiz_completed=False).update(quiz_completed=True)
+    return QuizProgress()
+
+
+def _topic_count_subquery():
+    return Coalesce(
+        Subquery(
+            Topic.objects.filter(course=OuterRef('pk'))
+            .values('course')
+            .annotate(total=Count('id'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _completed_topics_subquery():
+    return Coalesce(
+        Subquery(
+            TopicProgress.objects.filter(user=OuterRef('user'), topic__course=OuterRef('course'), completed=True)
+            .values('user')
+            .annotate(total=Count('id'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def recount_progress_counters(course_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """
+    Recompute the counters (of every course, or only `course_ids`) from the
+    source rows in a few bulk UPDATEs; returns how many rows were stale.
+    """
+    courses = Course.objects.all()
+    enrollments = UserCourse.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+        enrollments = enrollments.filter(course_id__in=course_ids)
+
+    with transaction.atomic():
+        courses_fixed = (
+            courses.annotate(actual=_topic_count_subquery())
+            .exclude(topic_count=F('actual'))
+            .update(topic_count=_topic_count_subquery())
+        )
+        enrollments_fixed = (
+            enrollments.annotate(actual=_completed_topics_subquery())
+            .exclude(completed_topics=F('actual'))
+            .update(completed_topics=_completed_topics_subquery())
+        )
+
+        course_topics = Subquery(
+            Course.objects.filter(pk=OuterRef('course')).values('topic_count'), output_field=IntegerField()
+        )
+        enrollments.update(
+            progress_percentage=Coalesce(
+                Least(F('completed_topics') * 100 / NullIf(course_topics, 0), Value(100)), 0
+            )
+        )
+        enrollments.filter(
+            completed=False, progress_percentage=100
+        ).update(completed=True, completed_at=timezone.now())
+
+    return {'courses': courses_fixed, 'enrollments': enrollments_fixed}
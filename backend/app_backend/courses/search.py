@@ -0,0 +1,191 @@
+import re
+import time
+from functools import reduce
+from operator import and_, or_
+from typing import List
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from .models import Course, CourseGenerationJob, Topic
+
+
+# Full-text search over courses and their topics.
+#
+# On SQLite the text lives in two FTS5 tables created by migration 0008:
+#   courses_search_course(title, description)              rowid = Course.id
+#   courses_search_topic(title, description, notes, course_id)  rowid = Topic.id
+# Keying rows by the model's primary key makes re-indexing a single row a
+# rowid lookup. The tables are kept current by courses.signals and can be
+# rebuilt with `manage.py rebuild_search_index`.
+#
+# Other backends (or SQLite builds without FTS5) fall back to icontains on
+# titles and descriptions; notes are stored compressed so they are only
+# searchable through FTS.
+#
+# Courses whose generation job hasn't completed (a streamed course is indexed
+# topic by topic while it is built) are left out of results.
+
+COURSE_TABLE = 'courses_search_course'
+TOPIC_TABLE = 'courses_search_topic'
+JOB_TABLE = CourseGenerationJob._meta.db_table
+
+# Upper bound on ranked results; keeps page-number pagination of results cheap
+MAX_RESULTS = 200
+
+# bm25 column weights: title matches count most, notes least
+COURSE_WEIGHTS = (10.0, 4.0)
+TOPIC_WEIGHTS = (5.0, 2.0, 1.0)
+
+# Seconds before fts_available() looks at the schema again, so a table
+# created or dropped by another process is noticed
+FTS_RECHECK_SECONDS = 60
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_fts_ready = {}  # database NAME -> (ready, checked_at)
+
+
+def fts_available(using=DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    ready, checked_at = _fts_ready.get(name, (False, None))
+    if checked_at is None or time.monotonic() - checked_at > FTS_RECHECK_SECONDS:
+        ready = COURSE_TABLE in connection.introspection.table_names()
+        _fts_ready[name] = (ready, time.monotonic())
+    return ready
+
+
+def _forget_fts(using=DEFAULT_DB_ALIAS) -> None:
+    _fts_ready.pop(connections[using].settings_dict['NAME'], None)
+
+
+def _tokens(query):
+    return _TOKEN.findall(query or '')[:16]
+
+
+def _match_expression(tokens, match_all):
+    # Each term is quoted so user input can't inject FTS syntax and is
+    # prefix-matched so partial words still hit
+    return (' ' if match_all else ' OR ').join(f'"{token}"*' for token in tokens)
+
+
+def _execute(*statements) -> None:
+    """Run index writes, skipping them if the FTS tables are missing."""
+    if not fts_available():
+        return
+    try:
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            for sql, params in statements:
+                cursor.execute(sql, params)
+    except OperationalError as e:
+        # Dropped by another process since we last looked
+        print(f"Search index write skipped: {str(e)}")
+        _forget_fts()
+
+
+def index_course(course: Course) -> None:
+    _execute(
+        (f"DELETE FROM {COURSE_TABLE} WHERE rowid = %s", [course.id]),
+        (f"INSERT INTO {COURSE_TABLE} (rowid, title, description) VALUES (%s, %s, %s)",
+         [course.id, course.title, course.description]),
+    )
+
+
+def index_topic(topic: Topic) -> None:
+    # Checked up front so notes aren't decompressed for nothing
+    if not fts_available():
+        return
+    _execute(
+        (f"DELETE FROM {TOPIC_TABLE} WHERE rowid = %s", [topic.id]),
+        (f"INSERT INTO {TOPIC_TABLE} (rowid, title, description, notes, course_id) VALUES (%s, %s, %s, %s, %s)",
+         [topic.id, topic.title, topic.description, topic.notes, topic.course_id]),
+    )
+
+
+def unindex_course(course_id: int) -> None:
+    _execute((f"DELETE FROM {COURSE_TABLE} WHERE rowid = %s", [course_id]))
+
+
+def unindex_topic(topic_id: int) -> None:
+    _execute((f"DELETE FROM {TOPIC_TABLE} WHERE rowid = %s", [topic_id]))
+
+
+def rebuild_index() -> int:
+    """Re-index every course and topic; returns the number of rows written."""
+    _forget_fts()
+    if not fts_available():
+        return 0
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {COURSE_TABLE}")
+        cursor.execute(f"DELETE FROM {TOPIC_TABLE}")
+    written = 0
+    for course in Course.objects.only('id', 'title', 'description').iterator(chunk_size=500):
+        index_course(course)
+        written += 1
+    for topic in Topic.objects.only('id', 'course_id', 'title', 'description', 'notes_gz').iterator(chunk_size=200):
+        index_topic(topic)
+        written += 1
+    return written
+
+
+def search_course_ids(query: str, limit: int = MAX_RESULTS, match_all: bool = True) -> List[int]:
+    """
+    Ids of courses matching every term of `query` (any term with
+    match_all=False), best match first.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    if fts_available():
+        try:
+            return _fts_search(tokens, limit, match_all)
+        except OperationalError as e:
+            print(f"Full-text search failed, falling back: {str(e)}")
+            _forget_fts()
+    return _fallback_search(tokens, limit, match_all)
+
+
+def _fts_search(tokens, limit, match_all):
+    match = _match_expression(tokens, match_all)
+    # Courses whose own title/description match come first; bm25() scores from
+    # the two tables aren't comparable, so they only order within those groups.
+    # bm25() is lower-is-better and summing it over a course's matching topics
+    # favours courses that match in many places.
+    course_weights = ', '.join(map(str, COURSE_WEIGHTS))
+    topic_weights = ', '.join(map(str, TOPIC_WEIGHTS))
+    sql = f"""
+        SELECT course_id, MAX(course_hit) AS course_hit, SUM(score) AS rank FROM (
+            SELECT rowid AS course_id, 1 AS course_hit, bm25({COURSE_TABLE}, {course_weights}) AS score
+            FROM {COURSE_TABLE} WHERE {COURSE_TABLE} MATCH %s
+            UNION ALL
+            SELECT course_id, 0 AS course_hit, bm25({TOPIC_TABLE}, {topic_weights}) AS score
+            FROM {TOPIC_TABLE} WHERE {TOPIC_TABLE} MATCH %s
+        )
+        WHERE course_id NOT IN (
+            SELECT course_id FROM {JOB_TABLE} WHERE course_id IS NOT NULL AND status <> %s
+        )
+        GROUP BY course_id
+        ORDER BY course_hit DESC, rank, course_id
+        LIMIT %s
+    """
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(sql, [match, match, 'completed', limit])
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def _fallback_search(tokens, limit, match_all):
+    matches = reduce(and_ if match_all else or_, (
+        Q(title__icontains=token) | Q(description__icontains=token)
+        | Q(topics__title__icontains=token) | Q(topics__description__icontains=token)
+        for token in tokens
+    ))
+    title_match = reduce(and_, (Q(title__icontains=token) for token in tokens))
+    return list(
+        Course.objects.filter(matches)
+        .exclude(generation_jobs__in=CourseGenerationJob.objects.exclude(status='completed'))
+        .annotate(title_hit=Case(When(title_match, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        .order_by('-title_hit', 'id')
+        .values_list('id', flat=True)
+        .distinct()[:limit]
+    )
@@ -1,32 +1,95 @@
 from rest_framework import serializers
-from .models import Course, Topic, Quiz, UserCourse, TopicProgress, QuizAttempt
+from .models import Course, Topic, Quiz, UserCourse, TopicProgress, QuizAttempt, CourseGenerationJob
+
+
+def _split_param(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value else set()
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for model serializers.
+
+    `?fields=a,b` (or the `fields` kwarg) limits the top-level serializer to
+    the named fields. Fields listed in Meta.expandable_fields are left out
+    unless requested with `?expand=name` (or the `expand` kwarg); expansion
+    applies at every nesting level that declares the field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._only_fields = kwargs.pop('fields', None)
+        self._expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        params = request.query_params if request is not None else {}
+
+        expand = set(self._expand) if self._expand is not None else _split_param(params.get('expand'))
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expand:
+                fields.pop(name, None)
+
+        only = set(self._only_fields) if self._only_fields is not None else None
+        if only is None and self._is_root():
+            only = _split_param(params.get('fields')) or None
+        if only is not None:
+            for name in set(fields) - only:
+                fields.pop(name)
+
+        return fields
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
 
 class TopicSerializer(serializers.ModelSerializer):
     class Meta:
         model = Topic
-        fields = ['id', 'title', 'description', 'order', 'notes', 'estimated_time']
+        fields = ['id', 'title', 'description', 'order', 'notes', 'estimated_time', 'estimated_minutes']
 
 class QuizSerializer(serializers.ModelSerializer):
+    """The student-facing quiz: answers and explanations come back only on submission."""
+    questions = serializers.JSONField(source='student_questions', read_only=True)
+
     class Meta:
         model = Quiz
-        fields = ['id', 'questions', 'created_at']
+        fields = ['id', 'questions', 'is_fallback', 'created_at']
+
+class TopicOutlineSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Topic without its notes; those come from TopicNotesAPIView or `?expand=notes`."""
+
+    class Meta:
+        model = Topic
+        fields = ['id', 'title', 'description', 'order', 'estimated_time', 'estimated_minutes', 'notes']
+        expandable_fields = ['notes']
 
-class CourseSerializer(serializers.ModelSerializer):
-    topics = TopicSerializer(many=True, read_only=True)
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    topics = TopicOutlineSerializer(many=True, read_only=True)
+    topic_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Course
-        fields = ['id', 'title', 'description', 'difficulty', 'estimated_duration', 'topics', 'created_at']
+        fields = ['id', 'title', 'description', 'difficulty', 'estimated_duration', 'topics', 'topic_count', 'created_at']
+
+    def get_topic_count(self, course):
+        # Prefer the prefetched topics when the view loaded them anyway
+        prefetched = getattr(course, '_prefetched_objects_cache', {}).get('topics')
+        return len(prefetched) if prefetched is not None else course.topic_count
 
-class UserCourseSerializer(serializers.ModelSerializer):
+class UserCourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     course = CourseSerializer(read_only=True)
     
     class Meta:
         model = UserCourse
         fields = ['id', 'course', 'enrolled_at', 'completed', 'completed_at', 'progress_percentage']
 
-class TopicProgressSerializer(serializers.ModelSerializer):
-    topic = TopicSerializer(read_only=True)
+class TopicProgressSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    topic = TopicOutlineSerializer(read_only=True)
     
     class Meta:
         model = TopicProgress
@@ -45,4 +108,31 @@ class CourseGenerationSerializer(serializers.Serializer):
         choices=['beginner', 'intermediate', 'advanced'],
         default='beginner'
     )
-    duration_weeks = serializers.IntegerField(default=4, min_value=1, max_value=12)
\ No newline at end of file
+    duration_weeks = serializers.IntegerField(default=4, min_value=1, max_value=12)
+
+class CourseGenerationJobSerializer(serializers.ModelSerializer):
+    course = CourseSerializer(read_only=True)
+    message = serializers.SerializerMethodField()
+    warning = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CourseGenerationJob
+        fields = [
+            'id', 'course_name', 'difficulty', 'duration_weeks', 'status', 'stage',
+            'topics_total', 'topics_done', 'course', 'message', 'warning', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+
+    def get_message(self, job):
+        if job.status == 'completed':
+            if job.is_fallback:
+                return 'Course generated with fallback content due to AI service issues.'
+            return 'Course generated successfully!'
+        if job.status == 'failed':
+            return 'Error generating course. Please try again later.'
+        return 'Course generation in progress.'
+
+    def get_warning(self, job):
+        if job.status == 'completed' and job.is_fallback:
+            return 'AI service temporarily unavailable.'
+        return None
@@ -0,0 +1,75 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Course, Topic, Quiz
+from . import search
+from .progress import add_topic_to_course, recount_progress_counters
+
+
+def touch_course(course_id):
+    """Bump Course.updated_at so cached payloads and ETags for the course change."""
+    Course.objects.filter(id=course_id).update(updated_at=timezone.now())
+
+
+# Saves that only touch counters or derived fields leave the search text alone
+_COURSE_SEARCH_FIELDS = {'title', 'description'}
+_TOPIC_SEARCH_FIELDS = {'title', 'description', 'notes_gz', 'course'}
+
+
+def _changes_search_text(update_fields, searched):
+    return update_fields is None or bool(searched & set(update_fields))
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, update_fields=None, **kwargs):
+    if _changes_search_text(update_fields, _COURSE_SEARCH_FIELDS):
+        search.index_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    search.unindex_course(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def topic_changed(sender, instance, **kwargs):
+    touch_course(instance.course_id)
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    if created:
+        add_topic_to_course(instance.course_id)
+    if _changes_search_text(update_fields, _TOPIC_SEARCH_FIELDS):
+        search.index_topic(instance)
+
+
+def _deleting_course(origin):
+    # origin is the instance or queryset whose delete() cascaded here
+    return isinstance(origin, Course) or getattr(origin, 'model', None) is Course
+
+
+@receiver(post_delete, sender=Topic)
+def topic_deleted(sender, instance, origin=None, **kwargs):
+    search.unindex_topic(instance.id)
+    # The topic's progress rows are already gone, so a recount of the course
+    # fixes topic_count and the completed topics of everyone enrolled; not
+    # needed when the course itself is going
+    if not _deleting_course(origin):
+        recount_progress_counters(course_ids=[instance.course_id])
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    course_id = Topic.objects.filter(id=instance.topic_id).values_list('course_id', flat=True).first()
+    if course_id is not None:
+        touch_course(course_id)
+
+
+@receiver(request_started, dispatch_uid='courses_start_generation_poller')
+def start_generation_queue(sender, **kwargs):
+    # Pending jobs outlive the process that queued them; the first request a
+    # process serves starts the poller that picks them up
+    from .jobs import start_generation_poller
+    start_generation_poller()
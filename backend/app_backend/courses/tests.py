@@ -1,3 +1,376 @@
-from django.test import TestCase
+import gzip
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ai_integration.services import AIService
+from . import search
+from .jobs import expire_stale_jobs, run_generation_job, start_or_join_generation, stream_generation_job
+from .models import Course, CourseGenerationJob, Quiz, QuizAttempt, Topic, TopicProgress, UserCourse, parse_estimated_minutes
+from .view_tracking import bulk_mark_notes_viewed
+
+User = get_user_model()
+
+ROADMAP = {
+    'description': 'A course about Go.',
+    'topics': [
+        {'title': f'Topic {i}', 'description': 'About it', 'estimated_time': '45 minutes', 'notes': '# Notes'}
+        for i in range(1, 4)
+    ],
+}
+QUIZ = [
+    {'id': str(i), 'question': f'Question {i}?', 'options': ['a', 'b', 'c', 'd'],
+     'correct_answer': i % 4, 'explanation': f'Because {i}'}
+    for i in range(5)
+]
+
+
+# Jobs run inline in these tests; with no in-process pool, requests don't
+# start the job poller either
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class GenerationJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='pw12345!x')
+
+    def generate(self, user, course_name='Go'):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/api/courses/generate/', {'course_name': course_name}, format='json')
+
+    def test_identical_requests_share_one_job(self):
+        other = User.objects.create_user(username='bob', password='pw12345!x')
+        first = self.generate(self.user)
+        second = self.generate(other, course_name='  go ')
+        self.assertEqual((first.status_code, second.status_code), (202, 202))
+        self.assertEqual(first.data['job']['id'], second.data['job']['id'])
+        self.assertEqual(CourseGenerationJob.objects.count(), 1)
+
+        with mock.patch.object(AIService, 'generate_course_roadmap', return_value=ROADMAP), \
+                mock.patch.object(AIService, 'generate_quizzes', side_effect=lambda titles, *a, **k: [QUIZ for _ in titles]):
+            run_generation_job(first.data['job']['id'])
+
+        job = CourseGenerationJob.objects.get()
+        self.assertEqual((job.status, job.stage), ('completed', 'done'))
+        self.assertEqual(job.course.topic_count, 3)
+        self.assertEqual(
+            set(UserCourse.objects.filter(course=job.course).values_list('user__username', flat=True)),
+            {'alice', 'bob'},
+        )
+
+        # Later requests are enrolled in the finished course right away
+        late = User.objects.create_user(username='carol', password='pw12345!x')
+        response = self.generate(late)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['course']['id'], job.course_id)
+        self.assertEqual(CourseGenerationJob.objects.count(), 1)
+
+    def test_unclaimed_pending_job_expires(self):
+        job, created = start_or_join_generation(self.user, 'Go', 'beginner', 4)
+        self.assertTrue(created)
+        self.assertIsNotNone(job.lease_expires_at)
+
+        # Its submission was lost; once the lease lapses a new request starts afresh
+        CourseGenerationJob.objects.filter(id=job.id).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        retry, created = start_or_join_generation(self.user, 'Go', 'beginner', 4)
+        self.assertTrue(created)
+        self.assertNotEqual(retry.id, job.id)
+        self.assertEqual(CourseGenerationJob.objects.get(id=job.id).status, 'failed')
+
+    def test_expired_job_cannot_complete(self):
+        job, _ = start_or_join_generation(self.user, 'Go', 'beginner', 4)
+
+        def expire_midway(titles, *args, **kwargs):
+            # The lease runs out while quizzes are generated and a retry takes over
+            CourseGenerationJob.objects.filter(id=job.id).update(
+                lease_expires_at=timezone.now() - timedelta(seconds=1)
+            )
+            self.assertEqual(expire_stale_jobs(), 1)
+            return [QUIZ for _ in titles]
+
+        with mock.patch.object(AIService, 'generate_course_roadmap', return_value=ROADMAP), \
+                mock.patch.object(AIService, 'generate_quizzes', side_effect=expire_midway):
+            run_generation_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(job.course_id)
+        self.assertFalse(Course.objects.exists())
+        self.assertFalse(UserCourse.objects.exists())
+
+
+def stream_roadmap(*args, **kwargs):
+    yield 'description', ROADMAP['description']
+    for topic in ROADMAP['topics']:
+        yield 'topic', topic
+
+
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class StreamGenerationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='pw12345!x')
+        self.job, _ = start_or_join_generation(
+            self.user, 'Go', 'beginner', 4, status='running', started_at=timezone.now()
+        )
+        for name, value in (('stream_course_roadmap', stream_roadmap), ('generate_quiz', lambda *a, **k: QUIZ)):
+            patcher = mock.patch.object(AIService, name, side_effect=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stream_until(self, event):
+        events = stream_generation_job(self.job)
+        for name, _ in events:
+            if name == event:
+                return events
+        self.fail(f'No {event} event')
+
+    def test_complete_stream(self):
+        events = [name for name, _ in stream_generation_job(self.job)]
+        self.assertEqual(events[0], 'course')
+        self.assertEqual(events.count('topic'), 3)
+        self.assertEqual(events[-1], 'complete')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'completed')
+        self.assertEqual(self.job.course.topic_count, 3)
+        self.assertEqual(self.job.course.topics.filter(quiz__isnull=False).count(), 3)
+        self.assertTrue(UserCourse.objects.filter(user=self.user, course=self.job.course).exists())
+
+    def test_disconnect_mid_stream_discards_partial_course(self):
+        events = self.stream_until('topic')
+        # Meanwhile another request for the title must not be enrolled in the partial course
+        other = User.objects.create_user(username='bob', password='pw12345!x')
+        client = APIClient()
+        client.force_authenticate(other)
+        response = client.post('/api/courses/generate/', {'course_name': 'Go', 'difficulty': 'advanced'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(UserCourse.objects.filter(user=other).exists())
+
+        events.close()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'failed')
+        self.assertFalse(Course.objects.exists())
+
+    def test_disconnect_after_complete_keeps_course(self):
+        events = self.stream_until('complete')
+        events.close()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'completed')
+        self.assertTrue(Course.objects.filter(id=self.job.course_id).exists())
+        self.assertTrue(UserCourse.objects.filter(user=self.user, course_id=self.job.course_id).exists())
+
+
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class EstimatedMinutesTests(TestCase):
+    # Study time used to be rounded to whole hours ('45 minutes' -> 60,
+    # '30 minutes' -> 0, '1.5 hours' -> 60 after int() failed). Durations are
+    # now counted exactly, which changes the totals shown for such topics.
+    CASES = {
+        '45 minutes': 45,
+        '30 minutes': 30,
+        '1.5 hours': 90,
+        '2 hours': 120,
+        '1 hour 30 minutes': 90,
+        '1.5-2 hrs': 90,
+        'about an hour': 60,
+        'self-paced': 0,
+        '': 0,
+    }
+
+    def test_parse_estimated_minutes(self):
+        for text, minutes in self.CASES.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_estimated_minutes(text), minutes)
+
+    def test_backfill_matches_save(self):
+        migration = import_module('courses.migrations.0004_topic_estimated_minutes')
+        for text, minutes in self.CASES.items():
+            with self.subTest(text=text):
+                self.assertEqual(migration.parse_estimated_minutes(text), minutes)
+
+    def test_study_time_counts_exact_minutes(self):
+        user = User.objects.create_user(username='alice', password='pw12345!x')
+        course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        for order, estimated_time in enumerate(['45 minutes', '1.5 hours', '30 minutes']):
+            topic = Topic.objects.create(course=course, title=f'T{order}', description='d', order=order,
+                                         estimated_time=estimated_time)
+            TopicProgress.objects.create(user=user, topic=topic, completed=True, completed_at=timezone.now())
+        UserCourse.objects.create(user=user, course=course)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/courses/my-courses/')
+        self.assertEqual(response.data['results'][0]['study_time_minutes'], 165)
+
+
+class TopicCountTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        self.topics = [
+            Topic.objects.create(course=self.course, title=f'T{order}', description='d', order=order)
+            for order in range(3)
+        ]
+
+    def test_topic_count_follows_creates_and_deletes(self):
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.topic_count, 3)
+
+        user = User.objects.create_user(username='alice', password='pw12345!x')
+        TopicProgress.objects.create(user=user, topic=self.topics[0], completed=True, completed_at=timezone.now())
+        UserCourse.objects.create(user=user, course=self.course, completed_topics=1, progress_percentage=33)
+        self.topics[0].delete()
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.topic_count, 2)
+        enrollment = UserCourse.objects.get(user=user)
+        self.assertEqual((enrollment.completed_topics, enrollment.progress_percentage), (0, 0))
+
+    def test_course_delete_skips_recount(self):
+        with mock.patch('courses.signals.recount_progress_counters') as recount:
+            self.course.delete()
+            Course.objects.create(title='Rust', description='d', difficulty='beginner', estimated_duration='4 weeks')
+            Topic.objects.create(course=Course.objects.get(title='Rust'), title='T', description='d', order=0)
+            Course.objects.filter(title='Rust').delete()
+        recount.assert_not_called()
+        self.assertFalse(Topic.objects.exists())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.finished = Course.objects.create(title='Go basics', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        self.building = Course.objects.create(title='Go advanced', description='d', difficulty='advanced', estimated_duration='4 weeks')
+        user = User.objects.create_user(username='alice', password='pw12345!x')
+        self.job = CourseGenerationJob.objects.create(
+            user=user, course_name='Go advanced', difficulty='advanced', duration_weeks=4,
+            dedupe_key='go advanced|advanced|4', status='running', course=self.building,
+        )
+
+    def test_courses_still_generating_are_hidden(self):
+        self.assertTrue(search.fts_available())
+        self.assertEqual(search.search_course_ids('go'), [self.finished.id])
+        self.job.status = 'completed'
+        self.job.save()
+        self.assertEqual(sorted(search.search_course_ids('go')), [self.finished.id, self.building.id])
+
+    def test_dropped_index_falls_back(self):
+        self.assertTrue(search.fts_available())
+        # The drop is rolled back after the test; don't leave it cached
+        self.addCleanup(search._forget_fts)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {search.COURSE_TABLE}")
+        self.assertEqual(search.search_course_ids('basics'), [self.finished.id])
+        self.assertFalse(search.fts_available())
+        # Writes from signals skip the missing table instead of failing the save
+        Course.objects.create(title='Go again', description='d', difficulty='beginner', estimated_duration='4 weeks')
+
+
+class NotesViewTrackingTests(TestCase):
+    def test_bulk_mark_counts_only_rows_written(self):
+        course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        topics = [Topic.objects.create(course=course, title=f'T{order}', description='d', order=order) for order in range(3)]
+        user = User.objects.create_user(username='alice', password='pw12345!x')
+        TopicProgress.objects.create(user=user, topic=topics[0], notes_viewed=True)
+        views = {(user.id, topic.id): course.id for topic in topics}
+
+        create_enrollments = UserCourse.objects.bulk_create
+
+        def concurrent_viewer(*args, **kwargs):
+            # Another request records a view of topics[1] in the meantime
+            TopicProgress.objects.create(user=user, topic=topics[1], notes_viewed=True)
+            return create_enrollments(*args, **kwargs)
+
+        with mock.patch.object(UserCourse.objects, 'bulk_create', side_effect=concurrent_viewer):
+            self.assertEqual(bulk_mark_notes_viewed(views), 1)
+        self.assertEqual(TopicProgress.objects.filter(user=user, notes_viewed=True).count(), 3)
+        self.assertEqual(bulk_mark_notes_viewed(views), 0)
+
+
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class QuizTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        self.topic = Topic.objects.create(course=course, title='T', description='d', order=1)
+        Quiz.objects.create(topic=self.topic, questions=QUIZ)
+        self.user = User.objects.create_user(username='alice', password='pw12345!x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def submit(self, answers):
+        return self.client.post(f'/api/courses/topic/{self.topic.id}/submit-quiz/', {'answers': answers}, format='json')
+
+    def test_students_never_receive_answers(self):
+        response = self.client.get(f'/api/courses/topic/{self.topic.id}/quiz/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['questions']), 5)
+        for question in response.data['questions']:
+            self.assertNotIn('correct_answer', question)
+            self.assertNotIn('explanation', question)
+
+    def test_submit_grades_against_answer_key(self):
+        answers = [question['correct_answer'] for question in QUIZ]
+        answers[0] = (answers[0] + 1) % 4
+        response = self.submit(answers)
+        self.assertEqual((response.data['score'], response.data['total_questions']), (4, 5))
+        self.assertTrue(response.data['passed'])
+        self.assertEqual(
+            [result['correct_answer'] for result in response.data['results']],
+            [question['correct_answer'] for question in QUIZ],
+        )
+        self.assertEqual([result['is_correct'] for result in response.data['results']], [False, True, True, True, True])
+        self.assertEqual(response.data['results'][1]['explanation'], 'Because 1')
+        self.assertTrue(TopicProgress.objects.get(user=self.user, topic=self.topic).completed)
+
+    def test_failed_and_malformed_submissions(self):
+        response = self.submit([3, 3, 3, 3, 3])
+        self.assertEqual(response.data['score'], 1)
+        self.assertFalse(response.data['passed'])
+        response = self.client.post(f'/api/courses/topic/{self.topic.id}/submit-quiz/', {'answers': 'nope'}, format='json')
+        self.assertEqual((response.status_code, response.data['score']), (200, 0))
+        self.assertEqual(QuizAttempt.objects.count(), 2)
+        self.assertFalse(TopicProgress.objects.get(user=self.user, topic=self.topic).completed)
+
+
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        self.topic = Topic.objects.create(course=course, title='T', description='d', order=1, notes='# First')
+        user = User.objects.create_user(username='alice', password='pw12345!x')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.url = f'/api/courses/topic/{self.topic.id}/notes/'
+
+    def test_unchanged_notes_revalidate_with_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['notes'], '# First')
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_editing_a_topic_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.topic.notes = '# Second'
+        self.topic.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['notes'], '# Second')
+
+    def test_raw_notes_are_served_compressed(self):
+        url = f'/api/courses/topic/{self.topic.id}/notes/raw/'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), b'# First')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], HTTP_ACCEPT_ENCODING='gzip').status_code, 304)
+        self.assertEqual(self.client.get(url).content, b'# First')
 
-# Create your tests here.
@@ -1,20 +1,30 @@
 from django.urls import path
 from .views import (
     GenerateCourseAPIView,
+    StreamGenerateCourseAPIView,
+    GenerationJobStatusAPIView,
     CourseDetailAPIView,
     TopicNotesAPIView,
+    TopicNotesRawAPIView,
+    NotesViewTrackingStatusAPIView,
     TopicQuizAPIView,
     SubmitQuizAPIView,
+    CourseSearchAPIView,
     MyCoursesAPIView,
     FeaturedCoursesAPIView
 )
 
 urlpatterns = [
     path('generate/', GenerateCourseAPIView.as_view(), name='generate_course'),
+    path('generate/stream/', StreamGenerateCourseAPIView.as_view(), name='stream_generate_course'),
+    path('generate/<int:job_id>/', GenerationJobStatusAPIView.as_view(), name='generation_job_status'),
     path('<int:course_id>/', CourseDetailAPIView.as_view(), name='get_course'),
     path('topic/<int:topic_id>/notes/', TopicNotesAPIView.as_view(), name='get_topic_notes'),
+    path('topic/<int:topic_id>/notes/raw/', TopicNotesRawAPIView.as_view(), name='get_topic_notes_raw'),
+    path('notes-views/status/', NotesViewTrackingStatusAPIView.as_view(), name='notes_view_tracking_status'),
     path('topic/<int:topic_id>/quiz/', TopicQuizAPIView.as_view(), name='get_topic_quiz'),
     path('topic/<int:topic_id>/submit-quiz/', SubmitQuizAPIView.as_view(), name='submit_quiz'),
+    path('search/', CourseSearchAPIView.as_view(), name='search_courses'),
     path('my-courses/', MyCoursesAPIView.as_view(), name='my_courses'),
     path('featured/', FeaturedCoursesAPIView.as_view(), name='featured_courses'),
 ]
@@ -0,0 +1,205 @@
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.db import connection, transaction
+from .models import TopicProgress, UserCourse
+
+
+# Notes are the most-read content, and TopicProgress.notes_viewed only ever
+# flips once per user and topic. Views are therefore recorded with a read
+# first and a write only when the flag actually changes, so repeat views
+# never take SQLite's write lock.
+#
+# With NOTES_VIEW_WRITE_BEHIND enabled, views are instead queued in memory
+# and written in one batch every NOTES_VIEW_FLUSH_SECONDS. A crash can lose
+# at most that window of "viewed" flags, which only feed progress display.
+
+ViewKey = Tuple[int, int]  # (user_id, topic_id)
+
+
+def mark_notes_viewed(user_id: int, topic_id: int, course_id: int) -> int:
+    """Set notes_viewed for one user and topic; returns the number of rows written."""
+    viewed = (
+        TopicProgress.objects.filter(user_id=user_id, topic_id=topic_id)
+        .values_list('notes_viewed', flat=True)
+        .first()
+    )
+    if viewed:
+        return 0
+    if viewed is False:
+        return TopicProgress.objects.filter(
+            user_id=user_id, topic_id=topic_id, notes_viewed=False
+        ).update(notes_viewed=True)
+
+    # First visit to this topic: make sure the user is enrolled, as before
+    UserCourse.objects.get_or_create(user_id=user_id, course_id=course_id)
+    _, created = TopicProgress.objects.get_or_create(
+        user_id=user_id, topic_id=topic_id, defaults={'notes_viewed': True}
+    )
+    if created:
+        return 1
+    # Lost a race with another request that created the row
+    return TopicProgress.objects.filter(
+        user_id=user_id, topic_id=topic_id, notes_viewed=False
+    ).update(notes_viewed=True)
+
+
+def bulk_mark_notes_viewed(views: Dict[ViewKey, int]) -> int:
+    """
+    Set notes_viewed for many (user_id, topic_id) -> course_id views in a
+    fixed handful of queries; returns the number of rows written.
+    """
+    if not views:
+        return 0
+    candidates = TopicProgress.objects.filter(
+        user_id__in={user_id for user_id, _ in views},
+        topic_id__in={topic_id for _, topic_id in views},
+    )
+    existing = {
+        (user_id, topic_id): (progress_id, viewed)
+        for progress_id, user_id, topic_id, viewed in candidates.values_list('id', 'user_id', 'topic_id', 'notes_viewed')
+    }
+    to_flip = [progress_id for key, (progress_id, viewed) in existing.items() if key in views and not viewed]
+    missing = [key for key in views if key not in existing]
+
+    written = 0
+    with transaction.atomic():
+        if to_flip:
+            written += TopicProgress.objects.filter(id__in=to_flip, notes_viewed=False).update(notes_viewed=True)
+        if missing:
+            enrollments = {(user_id, views[(user_id, topic_id)]) for user_id, topic_id in missing}
+            UserCourse.objects.bulk_create(
+                [UserCourse(user_id=user_id, course_id=course_id) for user_id, course_id in enrollments],
+                ignore_conflicts=True,
+            )
+            # bulk_create returns every object passed in, including the ones
+            # a concurrent viewer already inserted; count the rows instead.
+            # On SQLite the write above holds the database lock, so the
+            # difference between the two counts is exactly our inserts.
+            before = candidates.count()
+            TopicProgress.objects.bulk_create(
+                [TopicProgress(user_id=user_id, topic_id=topic_id, notes_viewed=True) for user_id, topic_id in missing],
+                ignore_conflicts=True,
+            )
+            written += candidates.count() - before
+    return written
+
+
+class NotesViewTracker:
+    """
+    Records notes views and counts the writes that were avoided, compared
+    with the old behaviour of one full-row UPDATE per view.
+    """
+
+    def __init__(self, write_behind: bool = False, flush_interval: float = 5.0,
+                 max_pending: int = 500, max_known: int = 10000):
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_known = max_known
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[ViewKey, int] = {}
+        # Views already written; repeats are dropped without touching the database
+        self._known: "OrderedDict[ViewKey, None]" = OrderedDict()
+        self._last_flush = time.monotonic()
+        self._flusher: Optional[threading.Thread] = None
+        self.views = 0
+        self.rows_written = 0
+        self.coalesced = 0
+        self.flushes = 0
+
+    def record(self, user_id: int, topic_id: int, course_id: int) -> None:
+        if not self.write_behind:
+            written = mark_notes_viewed(user_id, topic_id, course_id)
+            with self._lock:
+                self.views += 1
+                self.rows_written += written
+            return
+
+        key = (user_id, topic_id)
+        with self._lock:
+            self.views += 1
+            if key in self._known or key in self._pending:
+                self.coalesced += 1
+                return
+            self._pending[key] = course_id
+            due = len(self._pending) >= self.max_pending
+            self._start_flusher()
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write out every queued view; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            if not batch:
+                return 0
+            try:
+                written = bulk_mark_notes_viewed(batch)
+            except Exception as e:
+                print(f"Notes view flush failed, requeueing {len(batch)} view(s): {e}")
+                with self._lock:
+                    for key, course_id in batch.items():
+                        self._pending.setdefault(key, course_id)
+                return 0
+            with self._lock:
+                self.rows_written += written
+                self.flushes += 1
+                for key in batch:
+                    self._known[key] = None
+                    self._known.move_to_end(key)
+                while len(self._known) > self.max_known:
+                    self._known.popitem(last=False)
+            return written
+
+    def _start_flusher(self) -> None:
+        # Called with self._lock held
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='notes-view-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'write_behind': self.write_behind,
+                'views': self.views,
+                'rows_written': self.rows_written,
+                'writes_avoided': self.views - self.rows_written,
+                'coalesced': self.coalesced,
+                'pending': len(self._pending),
+                'flushes': self.flushes,
+            }
+
+
+_tracker: Optional[NotesViewTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_notes_view_tracker() -> NotesViewTracker:
+    """Return the process-wide notes view tracker."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = NotesViewTracker(
+                    write_behind=settings.NOTES_VIEW_WRITE_BEHIND,
+                    flush_interval=settings.NOTES_VIEW_FLUSH_SECONDS,
+                    max_pending=settings.NOTES_VIEW_MAX_PENDING,
+                )
+                if _tracker.write_behind:
+                    atexit.register(_tracker.flush)
+    return _tracker
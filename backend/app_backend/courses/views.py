@@ -1,20 +1,39 @@
+import re
 from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from django.db.models import Prefetch, Q, Sum
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from .models import Course, Topic, Quiz, UserCourse, TopicProgress, QuizAttempt
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from .models import Course, Topic, Quiz, UserCourse, TopicProgress, QuizAttempt, CourseGenerationJob, decompress_notes
 from .serializers import (
     CourseSerializer, TopicSerializer, QuizSerializer,
     UserCourseSerializer, TopicProgressSerializer, QuizAttemptSerializer,
-    CourseGenerationSerializer
+    CourseGenerationSerializer, CourseGenerationJobSerializer
 )
-from ai_integration.services import AIService
+from .jobs import enqueue_generation_job, start_or_join_generation, stream_generation_job
+from .progress import record_quiz_result
+from .caching import conditional_content_response, content_etag, content_key, get_or_build
+from .pagination import EnrollmentCursorPagination, FeaturedCourseCursorPagination, SearchResultsPagination
+from .search import search_course_ids
+from .view_tracking import get_notes_view_tracker
+from authentication.streaks import record_learning_activity
+from user_progress.rollup import bump_daily_activity
+from user_progress.achievements import COURSE_COMPLETED, QUIZ_SUBMITTED, record_event
+from .renderers import EventStreamRenderer, sse_event
 
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+
+_ACCEPTS_GZIP = re.compile(r'\bgzip\b')
 
 class GenerateCourseAPIView(APIView):
+    permission_classes = [IsAuthenticated]
 
     def post(self, request):
         serializer = CourseGenerationSerializer(data=request.data)
@@ -23,201 +42,377 @@ class GenerateCourseAPIView(APIView):
             difficulty = serializer.validated_data['difficulty']
             duration_weeks = serializer.validated_data['duration_weeks']
             
-            existing_course = Course.objects.filter(title=course_name).first()
-            print('Existing course:', existing_course)
-            if existing_course:
-                user_course, created = UserCourse.objects.get_or_create(
-                    user=request.user, course=existing_course
-                )
-                return Response({
-                    'course': CourseSerializer(existing_course).data,
-                    'message': 'Course already exists. You have been enrolled.'
-                })
-
-            try:
-                ai_service = AIService()
-                course_data = ai_service.generate_course_roadmap(course_name, difficulty, duration_weeks)
-                print('Generated course data:', course_data)
-                is_fallback_data = course_data.get('description', '').startswith(
-                    f'Master {course_name} with our AI-curated learning path'
-                )
+            existing = _enroll_in_existing_course(request, course_name)
+            if existing is not None:
+                return Response(existing)
+
+            # Generation can take minutes, so it runs on the worker pool and the
+            # client polls GenerationJobStatusAPIView for progress. Identical
+            # requests in flight share one job.
+            job, created = start_or_join_generation(request.user, course_name, difficulty, duration_weeks)
+            if created:
+                enqueue_generation_job(job)
+
+            return Response({
+                'job': CourseGenerationJobSerializer(job).data,
+                'status_url': reverse('generation_job_status', kwargs={'job_id': job.id}),
+                'message': 'Course generation started.' if created else
+                           'This course is already being generated. You will be enrolled when it is ready.',
+                # Close matches the user may want instead of waiting on generation
+                'similar_courses': _similar_courses(request, course_name),
+            }, status=status.HTTP_202_ACCEPTED)
 
-                course = Course.objects.create(
-                    title=course_name,
-                    description=course_data.get('description', f'Master {course_name} with our AI-curated learning path.'),
-                    difficulty=difficulty,
-                    estimated_duration=f"{duration_weeks} weeks"
-                )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-                for i, topic_data in enumerate(course_data.get('topics', [])):
-                    topic = Topic.objects.create(
-                        course=course,
-                        title=topic_data['title'],
-                        description=topic_data['description'],
-                        order=i + 1,
-                        notes=topic_data['notes'],
-                        estimated_time=topic_data['estimated_time']
-                    )
-                    quiz_questions = ai_service.generate_quiz(topic_data['title'], course_name)
-                    Quiz.objects.create(topic=topic, questions=quiz_questions)
-
-                UserCourse.objects.create(user=request.user, course=course)
-
-                return Response({
-                    'course': CourseSerializer(course).data,
-                    'message': 'Course generated successfully!' if not is_fallback_data else
-                               'Course generated with fallback content due to AI service issues.',
-                    'warning': 'AI service temporarily unavailable.' if is_fallback_data else None
-                }, status=status.HTTP_201_CREATED)
-
-            except Exception as e:
-                print(f"Course generation error: {str(e)}")
-                return Response({
-                    'error': 'Error generating course. Please try again later.',
-                    'details': 'AI service is currently experiencing issues.'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class StreamGenerateCourseAPIView(APIView):
+    """
+    Generate a course inline and push it to the client as server-sent events.
+
+    Events: `course` once the course row exists, `topic` for every saved topic,
+    `progress` while quizzes are saved, then `complete` (the job payload) or `error`.
+    If an identical generation is already in flight, a single `job` event with
+    its status URL is sent instead and the client can poll it.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        serializer = CourseGenerationSerializer(data=request.data)
+        if serializer.is_valid():
+            course_name = serializer.validated_data['course_name']
+
+            existing = _enroll_in_existing_course(request, course_name)
+            if existing is not None:
+                events = iter([('complete', existing)])
+            else:
+                job, created = start_or_join_generation(
+                    request.user,
+                    course_name,
+                    serializer.validated_data['difficulty'],
+                    serializer.validated_data['duration_weeks'],
+                    status='running',
+                    started_at=timezone.now(),
+                )
+                if created:
+                    events = stream_generation_job(job)
+                else:
+                    events = iter([('job', {
+                        'job': CourseGenerationJobSerializer(job).data,
+                        'status_url': reverse('generation_job_status', kwargs={'job_id': job.id}),
+                    })])
+
+            response = StreamingHttpResponse(
+                (sse_event(event, data) for event, data in events),
+                content_type='text/event-stream',
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def _topics_prefetch(request, lookup='topics'):
+    """Prefetch topics for listings, leaving the notes column behind unless ?expand=notes."""
+    topics = Topic.objects.all()
+    if 'notes' not in request.query_params.get('expand', '').split(','):
+        topics = topics.defer('notes_gz')
+    return Prefetch(lookup, queryset=topics)
+
+def _enroll_in_existing_course(request, course_name):
+    # Same normalization as CourseGenerationJob.make_dedupe_key, so coalesced
+    # requests resolve to the course their shared job produced. A streamed
+    # course exists before its job completes; until then it is still missing
+    # topics and quizzes, so it is skipped here.
+    existing_course = (
+        Course.objects.filter(title__iexact=' '.join(course_name.split()))
+        .exclude(generation_jobs__status__in=[*CourseGenerationJob.ACTIVE_STATUSES, 'failed'])
+        .prefetch_related(_topics_prefetch(request))
+        .first()
+    )
+    if not existing_course:
+        return None
+
+    UserCourse.objects.get_or_create(user=request.user, course=existing_course)
+    return {
+        'course': CourseSerializer(existing_course, context={'request': request}).data,
+        'message': 'Course already exists. You have been enrolled.'
+    }
+
+SEARCH_RESULT_FIELDS = ['id', 'title', 'description', 'difficulty', 'estimated_duration', 'topic_count', 'created_at']
+
+def _serialize_search_results(request, course_ids):
+    courses = Course.objects.in_bulk(course_ids)
+    ranked = [courses[course_id] for course_id in course_ids if course_id in courses]
+    return CourseSerializer(ranked, many=True, fields=SEARCH_RESULT_FIELDS, context={'request': request}).data
+
+def _similar_courses(request, course_name, limit=3):
+    return _serialize_search_results(request, search_course_ids(course_name, limit=limit, match_all=False))
+
+class GenerationJobStatusAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        jobs = CourseGenerationJob.objects.select_related('course').prefetch_related(
+            _topics_prefetch(request, 'course__topics')
+        ).filter(
+            Q(user=request.user) | Q(subscribers=request.user)
+        ).distinct()
+        job = get_object_or_404(jobs, id=job_id)
+        return Response(CourseGenerationJobSerializer(job, context={'request': request}).data)
+
 class CourseDetailAPIView(APIView):
+    """
+    Course with the caller's progress, without writing anything.
+
+    The shared course/topic outline is cached per Course.updated_at; the
+    caller's progress is layered on top per request. Enrollment and topic
+    progress rows are created when the user acts (views notes, submits a
+    quiz); until then they are represented by unsaved default instances.
+    All progress for the course is fetched in one query. Topics come without
+    notes (see TopicNotesAPIView) unless ?expand=notes.
+    """
 
     def get(self, request, course_id):
-        course = get_object_or_404(Course, id=course_id)
-        user_course, _ = UserCourse.objects.get_or_create(user=request.user, course=course)
+        course = get_object_or_404(Course.objects.only('id', 'updated_at'), id=course_id)
+        user = request.user if request.user.is_authenticated else None
+        context = {'request': request}
+
+        def build():
+            full = Course.objects.prefetch_related(_topics_prefetch(request)).get(id=course.id)
+            return CourseSerializer(full, context=context).data
+
+        content = get_or_build(content_key('course', course.id, course.updated_at, request), build)
+
+        user_course = None
+        progress_by_topic = {}
+        if user is not None:
+            user_course = UserCourse.objects.filter(user=user, course_id=course.id).first()
+            progress_by_topic = {
+                progress.topic_id: progress
+                for progress in TopicProgress.objects.filter(user=user, topic__course_id=course.id)
+            }
+        if user_course is None:
+            user_course = UserCourse(user=user, course_id=course.id)
+
+        course_data = dict(content)
+        if 'topics' in content:
+            progress_fields = [name for name in TopicProgressSerializer.Meta.fields if name != 'topic']
+            course_data['topics'] = []
+            for topic_data in content['topics']:
+                progress = progress_by_topic.get(topic_data['id']) or TopicProgress(user=user, topic_id=topic_data['id'])
+                progress_data = TopicProgressSerializer(progress, context=context, fields=progress_fields).data
+                progress_data['topic'] = topic_data
+                course_data['topics'].append({**topic_data, 'progress': progress_data})
+
+        user_course_fields = [name for name in UserCourseSerializer.Meta.fields if name != 'course']
+        course_data['user_progress'] = {
+            **UserCourseSerializer(user_course, context=context, fields=user_course_fields).data,
+            'course': content,
+        }
+        course_data['is_enrolled'] = user_course.pk is not None
 
-        topics_with_progress = []
-        for topic in course.topics.all():
-            progress, _ = TopicProgress.objects.get_or_create(user=request.user, topic=topic)
-            topic_data = TopicSerializer(topic).data
-            topic_data['progress'] = TopicProgressSerializer(progress).data
-            topics_with_progress.append(topic_data)
+        return Response(course_data)
 
-        course_data = CourseSerializer(course).data
-        course_data['topics'] = topics_with_progress
-        course_data['user_progress'] = UserCourseSerializer(user_course).data
+def _topic_with_version(topic_id):
+    """The topic's id and course version, without loading any content."""
+    return get_object_or_404(
+        Topic.objects.select_related('course').only('id', 'course_id', 'course__updated_at'), id=topic_id
+    )
 
-        return Response(course_data)
+def _record_notes_view(user, topic):
+    get_notes_view_tracker().record(user.id, topic.id, topic.course_id)
 
 class TopicNotesAPIView(APIView):
 
     def get(self, request, topic_id):
-        topic = get_object_or_404(Topic, id=topic_id)
-        progress, _ = TopicProgress.objects.get_or_create(user=request.user, topic=topic)
-        progress.notes_viewed = True
-        progress.save()
-        return Response(TopicSerializer(topic).data)
+        topic = _topic_with_version(topic_id)
+        _record_notes_view(request.user, topic)
+
+        updated_at = topic.course.updated_at
+        return conditional_content_response(
+            request,
+            content_key('notes', topic.id, updated_at),
+            updated_at,
+            lambda: TopicSerializer(Topic.objects.get(id=topic.id)).data,
+        )
+
+class TopicNotesRawAPIView(APIView):
+    """
+    A topic's notes as text/markdown.
+
+    Notes are stored gzip-compressed, so clients that accept gzip get the
+    stored bytes with Content-Encoding: gzip and nothing is decompressed or
+    recompressed on the way out.
+    """
+
+    def get(self, request, topic_id):
+        topic = _topic_with_version(topic_id)
+        _record_notes_view(request.user, topic)
+
+        use_gzip = bool(_ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        updated_at = topic.course.updated_at
+        etag = content_etag(content_key('notes-raw', topic.id, updated_at, encoding='gzip' if use_gzip else ''))
+        last_modified = int(updated_at.timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            stored = bytes(Topic.objects.filter(id=topic.id).values_list('notes_gz', flat=True).get())
+            if use_gzip:
+                response = HttpResponse(stored, content_type='text/markdown; charset=utf-8')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(decompress_notes(stored), content_type='text/markdown; charset=utf-8')
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+class NotesViewTrackingStatusAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_notes_view_tracker().stats())
 
 class TopicQuizAPIView(APIView):
 
     def get(self, request, topic_id):
-        topic = get_object_or_404(Topic, id=topic_id)
-        quiz = get_object_or_404(Quiz, topic=topic)
-        quiz_data = QuizSerializer(quiz).data
-
-        is_fallback = False
-        questions = quiz_data.get('questions', [])
-        if questions and isinstance(questions, list):
-            first_q = questions[0]
-            if (
-                isinstance(first_q, dict) and
-                'main purpose of' in first_q.get('question', '').lower() and
-                'fundamental concept' in first_q.get('explanation', '').lower()
-            ):
-                is_fallback = True
-        quiz_data['is_fallback'] = is_fallback
-
-        return Response(quiz_data)
+        topic = _topic_with_version(topic_id)
+        updated_at = topic.course.updated_at
+        return conditional_content_response(
+            request,
+            content_key('quiz', topic.id, updated_at),
+            updated_at,
+            lambda: self._quiz_payload(topic),
+        )
+
+    def _quiz_payload(self, topic):
+        # Everything here was precomputed when the quiz was saved
+        quiz = get_object_or_404(
+            Quiz.objects.only('id', 'topic_id', 'student_questions', 'is_fallback', 'created_at'), topic=topic
+        )
+        return QuizSerializer(quiz).data
 
 class SubmitQuizAPIView(APIView):
 
     def post(self, request, topic_id):
-        topic = get_object_or_404(Topic, id=topic_id)
-        quiz = get_object_or_404(Quiz, topic=topic)
+        topic = get_object_or_404(Topic.objects.select_related('course'), id=topic_id)
+        quiz = get_object_or_404(Quiz.objects.only('id', 'topic_id', 'answer_key', 'explanations'), topic=topic)
         user_answers = request.data.get('answers', [])
-        questions = quiz.questions
-
-        score = 0
-        for i, question in enumerate(questions):
-            if i < len(user_answers) and user_answers[i] == question.get('correct_answer'):
-                score += 1
+        if not isinstance(user_answers, list):
+            user_answers = []
+        answer_key = quiz.answer_key
+        total_questions = len(answer_key)
+
+        correct = [
+            i < len(user_answers) and answer is not None and user_answers[i] == answer
+            for i, answer in enumerate(answer_key)
+        ]
+        score = sum(correct)
+        passed = total_questions > 0 and score >= total_questions * 0.7
 
         QuizAttempt.objects.create(
             user=request.user,
             quiz=quiz,
             score=score,
-            total_questions=len(questions),
+            total_questions=total_questions,
             answers=user_answers
         )
 
-        progress, _ = TopicProgress.objects.get_or_create(user=request.user, topic=topic)
-        progress.quiz_completed = True
-        if score >= len(questions) * 0.7:
-            progress.completed = True
-            progress.completed_at = timezone.now()
-        progress.save()
-
-        user_course = UserCourse.objects.get(user=request.user, course=topic.course)
-        completed_topics = TopicProgress.objects.filter(user=request.user, topic__course=topic.course, completed=True).count()
-        total_topics = topic.course.topics.count()
-        user_course.progress_percentage = int((completed_topics / total_topics) * 100)
-        if user_course.progress_percentage == 100:
-            user_course.completed = True
-            user_course.completed_at = timezone.now()
-        user_course.save()
-
-        from authentication.views import update_user_learning_streak
-        update_user_learning_streak(request.user)
+        progress = record_quiz_result(request.user, topic, passed=passed)
+        bump_daily_activity(request.user, quizzes_taken=1, topics_completed=int(progress.first_completion))
+        event_context = {}
+        if progress.first_completion:
+            # A newly completed topic counts towards the learning streak
+            event_context['streak'] = record_learning_activity(request.user)
+        record_event(request.user, QUIZ_SUBMITTED, **event_context)
+        if progress.course_completed:
+            enrolled_at = UserCourse.objects.filter(
+                user=request.user, course_id=topic.course_id
+            ).values_list('enrolled_at', flat=True).get()
+            record_event(request.user, COURSE_COMPLETED, days_to_complete=(timezone.now() - enrolled_at).days)
 
         return Response({
             'score': score,
-            'total_questions': len(questions),
-            'percentage': int((score / len(questions)) * 100),
-            'passed': score >= len(questions) * 0.7
+            'total_questions': total_questions,
+            'percentage': int((score / total_questions) * 100) if total_questions else 0,
+            'passed': passed,
+            # Per-question review, only revealed once the answers are in
+            'results': [
+                {'correct_answer': answer, 'explanation': explanation, 'is_correct': is_correct}
+                for answer, explanation, is_correct in zip(answer_key, quiz.explanations, correct)
+            ],
         })
 
+class CourseSearchAPIView(APIView):
+    pagination_class = SearchResultsPagination
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'q': ['This query parameter is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(search_course_ids(query), request, view=self)
+        return paginator.get_paginated_response(_serialize_search_results(request, page))
+
 class MyCoursesAPIView(APIView):
+    pagination_class = EnrollmentCursorPagination
 
     def get(self, request):
-        user_courses = UserCourse.objects.filter(user=request.user).select_related('course').prefetch_related('course__topics').order_by('-enrolled_at')
+        user_courses = (
+            UserCourse.objects.filter(user=request.user)
+            .select_related('course')
+            .prefetch_related(_topics_prefetch(request, 'course__topics'))
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(user_courses, request, view=self)
+
+        # Study time for the courses on this page in one grouped query
+        study_minutes = dict(
+            TopicProgress.objects.filter(
+                user=request.user, completed=True, topic__course_id__in=[uc.course_id for uc in page]
+            )
+            .values('topic__course_id')
+            .annotate(minutes=Sum('topic__estimated_minutes'))
+            .values_list('topic__course_id', 'minutes')
+        )
 
         course_data = []
-        for user_course in user_courses:
-            course = user_course.course
-            course_study_time = 0
-
-            completed_topics = TopicProgress.objects.filter(
-                user=request.user,
-                topic__course=course,
-                completed=True
-            ).select_related('topic')
-
-            for topic_progress in completed_topics:
-                topic = topic_progress.topic
-                estimated_time = topic.estimated_time
-                hours = 0
-                if estimated_time:
-                    if 'hour' in estimated_time.lower():
-                        try:
-                            hours = int(estimated_time.split()[0])
-                        except:
-                            hours = 1
-                    elif 'minute' in estimated_time.lower():
-                        try:
-                            minutes = int(estimated_time.split()[0])
-                            hours = round(minutes / 60)
-                        except:
-                            hours = 1
-                course_study_time += hours * 60
-
-            course_serialized = UserCourseSerializer(user_course).data
-            course_serialized['study_time_minutes'] = course_study_time
+        for user_course in page:
+            course_serialized = UserCourseSerializer(user_course, context={'request': request}).data
+            course_serialized['study_time_minutes'] = study_minutes.get(user_course.course_id) or 0
             course_data.append(course_serialized)
 
-        return Response(course_data)
+        return paginator.get_paginated_response(course_data)
 
 class FeaturedCoursesAPIView(APIView):
+    pagination_class = FeaturedCourseCursorPagination
 
     def get(self, request):
-        featured = Course.objects.all()[:4]
-        return Response(CourseSerializer(featured, many=True).data)
-
+        paginator = self.pagination_class()
+        # Page over (id, created_at, updated_at) only; the content itself comes from the cache
+        featured = paginator.paginate_queryset(
+            Course.objects.values('id', 'created_at', 'updated_at'), request, view=self
+        )
+        if not featured:
+            return paginator.get_paginated_response([])
+
+        ids = [course['id'] for course in featured]
+        updated_at = max(course['updated_at'] for course in featured)
+
+        def build():
+            courses = Course.objects.filter(id__in=ids).prefetch_related(_topics_prefetch(request))
+            courses_by_id = {course.id: course for course in courses}
+            ordered = [courses_by_id[course_id] for course_id in ids if course_id in courses_by_id]
+            return CourseSerializer(ordered, many=True, context={'request': request}).data
+
+        return conditional_content_response(
+            request,
+            # The key (and so the ETag) changes once a later page appears
+            content_key('featured', '-'.join(map(str, ids)) + ('+' if paginator.has_next else ''), updated_at, request),
+            updated_at,
+            build,
+            paginator=paginator,
+        )
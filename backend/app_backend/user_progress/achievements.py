@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Tuple
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import Achievement, AchievementState
+
+
+# Achievement rules, evaluated when an activity event happens rather than by
+# recounting history on every request.
+#
+# Each rule names the events that can change its outcome and the facts it
+# reads. Facts come from the event's context (e.g. the streak the caller just
+# computed) or from the user's AchievementState counters. An event with no
+# interested rules, or whose context already rules every interested rule out,
+# costs no queries at all. Earned achievements are tracked as bits in
+# AchievementState.earned, so an earned rule is never re-checked.
+#
+# To add an achievement: add its choice to Achievement.ACHIEVEMENT_TYPES and a
+# Rule below with a new, never-reused bit.
+
+SESSION_LOGGED = 'session_logged'
+QUIZ_SUBMITTED = 'quiz_submitted'
+COURSE_COMPLETED = 'course_completed'
+
+# Counters each event advances
+EVENT_COUNTERS = {
+    QUIZ_SUBMITTED: 'quizzes_taken',
+    COURSE_COMPLETED: 'courses_completed',
+}
+STATE_FACTS = frozenset({'courses_completed', 'quizzes_taken'})
+
+# A course finished within this many days of enrolling earns Fast Learner
+FAST_LEARNER_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Rule:
+    achievement_type: str
+    bit: int
+    events: FrozenSet[str]
+    needs: Tuple[str, ...]
+    test: Callable[[Dict], bool]
+
+    @property
+    def mask(self) -> int:
+        return 1 << self.bit
+
+
+RULES = (
+    Rule('first course', 0, frozenset({COURSE_COMPLETED}), ('courses_completed',),
+         lambda facts: facts['courses_completed'] >= 1),
+    Rule('quiz master', 1, frozenset({QUIZ_SUBMITTED}), ('quizzes_taken',),
+         lambda facts: facts['quizzes_taken'] >= 10),
+    Rule('streak 7', 2, frozenset({SESSION_LOGGED, QUIZ_SUBMITTED}), ('streak',),
+         lambda facts: facts['streak'] >= 7),
+    Rule('streak 30', 3, frozenset({SESSION_LOGGED, QUIZ_SUBMITTED}), ('streak',),
+         lambda facts: facts['streak'] >= 30),
+    Rule('fast learner', 4, frozenset({COURSE_COMPLETED}), ('days_to_complete',),
+         lambda facts: facts['days_to_complete'] <= FAST_LEARNER_DAYS),
+)
+
+RULES_BY_EVENT: Dict[str, Tuple[Rule, ...]] = {
+    event: tuple(rule for rule in RULES if event in rule.events)
+    for event in (SESSION_LOGGED, QUIZ_SUBMITTED, COURSE_COMPLETED)
+}
+
+
+def _bootstrap_state(user) -> None:
+    """Create the user's state row from history; runs once per user."""
+    from courses.models import UserCourse, QuizAttempt
+
+    earned_types = set(Achievement.objects.filter(user=user).values_list('achievement_type', flat=True))
+    try:
+        with transaction.atomic():
+            AchievementState.objects.create(
+                user=user,
+                earned=sum(rule.mask for rule in RULES if rule.achievement_type in earned_types),
+                courses_completed=UserCourse.objects.filter(user=user, completed=True).count(),
+                quizzes_taken=QuizAttempt.objects.filter(user=user).count(),
+            )
+    except IntegrityError:
+        pass
+
+
+def record_event(user, event: str, count: int = 1, **context) -> List[str]:
+    """
+    Apply an activity event: advance its counter by `count` and award any
+    achievements it unlocks. Returns the newly earned achievement types.
+    """
+    state = AchievementState.objects.filter(user=user)
+    counter = EVENT_COUNTERS.get(event)
+    if counter and not state.update(**{counter: F(counter) + count}):
+        # The bootstrap counts the row that triggered this event
+        _bootstrap_state(user)
+
+    # Rules the context alone can settle are settled before any query
+    candidates = []
+    for rule in RULES_BY_EVENT.get(event, ()):
+        if any(fact not in context and fact not in STATE_FACTS for fact in rule.needs):
+            continue
+        if all(fact in context for fact in rule.needs) and not rule.test(context):
+            continue
+        candidates.append(rule)
+    if not candidates:
+        return []
+
+    for _ in range(3):
+        row = state.values('earned', *STATE_FACTS).first()
+        if row is None:
+            _bootstrap_state(user)
+            continue
+        facts = {**row, **context}
+        unlocked = [rule for rule in candidates if not row['earned'] & rule.mask and rule.test(facts)]
+        if not unlocked:
+            return []
+        earned = row['earned'] | sum(rule.mask for rule in unlocked)
+        # Only the request that flips the bits creates the Achievement rows
+        if state.filter(earned=row['earned']).update(earned=earned):
+            Achievement.objects.bulk_create(
+                [Achievement(user=user, achievement_type=rule.achievement_type) for rule in unlocked]
+            )
+            return [rule.achievement_type for rule in unlocked]
+    return []
@@ -1,6 +1,8 @@
 from django.contrib import admin
-from .models import StudySession, Achievement
+from .models import StudySession, Achievement, AchievementState, DailyActivity
 # Register your models here.
 
 admin.site.register(StudySession)  
-admin.site.register(Achievement)
\ No newline at end of file
+admin.site.register(Achievement)
+admin.site.register(DailyActivity)
+admin.site.register(AchievementState)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from user_progress.rollup import rebuild_daily_activity
+
+
+class Command(BaseCommand):
+    help = 'Check DailyActivity against study sessions, topic completions and quiz attempts, and repair it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report differences without writing anything.')
+
+    def handle(self, *args, **options):
+        result = rebuild_daily_activity(check_only=options['check'])
+        summary = f"{result['missing']} missing, {result['stale']} stale, {result['orphaned']} orphaned day row(s)"
+        if options['check']:
+            style = self.style.SUCCESS if not any(result.values()) else self.style.WARNING
+            self.stdout.write(style(f"Checked daily activity: {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired daily activity: {summary}"))
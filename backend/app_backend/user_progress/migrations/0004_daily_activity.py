@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_activity(apps, schema_editor):
+    StudySession = apps.get_model('user_progress', 'StudySession')
+    TopicProgress = apps.get_model('courses', 'TopicProgress')
+    QuizAttempt = apps.get_model('courses', 'QuizAttempt')
+    DailyActivity = apps.get_model('user_progress', 'DailyActivity')
+
+    totals = {}
+
+    def add(user_id, day, **values):
+        row = totals.setdefault((user_id, day), {'minutes': 0, 'sessions': 0, 'topics_completed': 0, 'quizzes_taken': 0})
+        for field, value in values.items():
+            row[field] += value or 0
+
+    sessions = (
+        StudySession.objects.annotate(day=TruncDate('session_date')).values('user_id', 'day')
+        .annotate(minutes=Sum('duration_minutes'), sessions=Count('id')).order_by()
+    )
+    for row in sessions:
+        add(row['user_id'], row['day'], minutes=row['minutes'], sessions=row['sessions'])
+    completions = (
+        TopicProgress.objects.filter(completed=True, completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at')).values('user_id', 'day')
+        .annotate(total=Count('id')).order_by()
+    )
+    for row in completions:
+        add(row['user_id'], row['day'], topics_completed=row['total'])
+    attempts = (
+        QuizAttempt.objects.annotate(day=TruncDate('completed_at')).values('user_id', 'day')
+        .annotate(total=Count('id')).order_by()
+    )
+    for row in attempts:
+        add(row['user_id'], row['day'], quizzes_taken=row['total'])
+
+    DailyActivity.objects.bulk_create(
+        [DailyActivity(user_id=user_id, date=day, **values) for (user_id, day), values in totals.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_progress', '0003_alter_achievement_unique_together_and_more'),
+        ('courses', '0009_quiz_answer_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('minutes', models.PositiveIntegerField(default=0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('topics_completed', models.PositiveIntegerField(default=0)),
+                ('quizzes_taken', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_activity')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_activity, migrations.RunPython.noop),
+    ]
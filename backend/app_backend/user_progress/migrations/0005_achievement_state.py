@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# Achievements used to be stored under their display label rather than the
+# choice key, so get_achievement_type_display() showed the raw value
+LABEL_TO_KEY = {
+    'First Course Completed': 'first course',
+    'Quiz Master': 'quiz master',
+    '7 Day Streak': 'streak 7',
+    '30 Day Streak': 'streak 30',
+    'Fast Learner': 'fast learner',
+}
+# Bits of AchievementState.earned, as assigned in user_progress.achievements.RULES
+ACHIEVEMENT_BITS = {'first course': 0, 'quiz master': 1, 'streak 7': 2, 'streak 30': 3, 'fast learner': 4}
+
+
+def fix_achievements_and_build_state(apps, schema_editor):
+    Achievement = apps.get_model('user_progress', 'Achievement')
+    AchievementState = apps.get_model('user_progress', 'AchievementState')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserCourse = apps.get_model('courses', 'UserCourse')
+    QuizAttempt = apps.get_model('courses', 'QuizAttempt')
+
+    for label, key in LABEL_TO_KEY.items():
+        Achievement.objects.filter(achievement_type=label).update(achievement_type=key)
+
+    # Keep the earliest row of each achievement per user
+    earned = {}
+    duplicates = []
+    for achievement in Achievement.objects.order_by('earned_at', 'id'):
+        types = earned.setdefault(achievement.user_id, set())
+        if achievement.achievement_type in types:
+            duplicates.append(achievement.id)
+        types.add(achievement.achievement_type)
+    Achievement.objects.filter(id__in=duplicates).delete()
+
+    courses_completed = dict(
+        UserCourse.objects.filter(completed=True).values('user_id')
+        .annotate(total=Count('id')).values_list('user_id', 'total').order_by()
+    )
+    quizzes_taken = dict(
+        QuizAttempt.objects.values('user_id')
+        .annotate(total=Count('id')).values_list('user_id', 'total').order_by()
+    )
+    AchievementState.objects.bulk_create([
+        AchievementState(
+            user_id=user_id,
+            earned=sum(1 << ACHIEVEMENT_BITS[t] for t in earned.get(user_id, ()) if t in ACHIEVEMENT_BITS),
+            courses_completed=courses_completed.get(user_id, 0),
+            quizzes_taken=quizzes_taken.get(user_id, 0),
+        )
+        for user_id in User.objects.values_list('id', flat=True)
+    ], batch_size=500)
+
+
+def restore_labels(apps, schema_editor):
+    Achievement = apps.get_model('user_progress', 'Achievement')
+    for label, key in LABEL_TO_KEY.items():
+        Achievement.objects.filter(achievement_type=key).update(achievement_type=label)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_learning_streak_state'),
+        ('user_progress', '0004_daily_activity'),
+        ('courses', '0009_quiz_answer_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AchievementState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='achievement_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('earned', models.PositiveIntegerField(default=0)),
+                ('courses_completed', models.PositiveIntegerField(default=0)),
+                ('quizzes_taken', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fix_achievements_and_build_state, restore_labels),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_progress', '0005_achievement_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studysession',
+            name='session_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
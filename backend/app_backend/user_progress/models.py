@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -8,11 +9,33 @@ class StudySession(models.Model):
     course = models.ForeignKey('courses.Course', on_delete=models.CASCADE)
     topic = models.ForeignKey('courses.Topic', on_delete=models.CASCADE, null=True, blank=True)
     duration_minutes = models.IntegerField()
-    session_date = models.DateTimeField(auto_now_add=True)
+    # Defaults to now; clients syncing offline study send their own timestamps
+    session_date = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
         return f"{self.user.username} - {self.course.title} - {self.duration_minutes}min"
 
+class DailyActivity(models.Model):
+    """
+    Per-user, per-day totals of learning activity, kept current by
+    user_progress.rollup as the underlying rows are written. Check or rebuild
+    from raw history with `manage.py rebuild_daily_activity`.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    minutes = models.PositiveIntegerField(default=0)
+    sessions = models.PositiveIntegerField(default=0)
+    topics_completed = models.PositiveIntegerField(default=0)
+    quizzes_taken = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_activity'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date} - {self.minutes}min"
+
 class Achievement(models.Model):
     ACHIEVEMENT_TYPES = [
         ('first course', 'First Course Completed'),
@@ -30,4 +53,17 @@ class Achievement(models.Model):
         unique_together = ['user', 'achievement_type', 'earned_at']
     
     def __str__(self):
-        return f"{self.user.username} - {self.get_achievement_type_display()} - {self.earned_at.date()}"
\ No newline at end of file
+        return f"{self.user.username} - {self.get_achievement_type_display()} - {self.earned_at.date()}"
+
+class AchievementState(models.Model):
+    """
+    Per-user facts the achievement rules (user_progress.achievements) are
+    evaluated against, plus a bitmask of the achievements already earned.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='achievement_state')
+    earned = models.PositiveIntegerField(default=0)
+    courses_completed = models.PositiveIntegerField(default=0)
+    quizzes_taken = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - achievements {self.earned:b}"
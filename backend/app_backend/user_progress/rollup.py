@@ -0,0 +1,111 @@
+from datetime import date
+from typing import Dict, Optional, Tuple
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import DailyActivity, StudySession
+
+
+# DailyActivity rows are bumped by the code paths that write the raw rows:
+#   LogStudySessionAPIView -> minutes, sessions
+#   SubmitQuizAPIView      -> quizzes_taken, and topics_completed on a first completion
+# so dashboards read one row per day shown instead of every event ever logged.
+
+COUNTERS = ('minutes', 'sessions', 'topics_completed', 'quizzes_taken')
+
+DayKey = Tuple[int, date]  # (user_id, date)
+
+
+def bump_daily_activity(user, day: Optional[date] = None, **increments: int) -> None:
+    """Add `increments` (any of COUNTERS) to the user's row for `day`, creating it if needed."""
+    increments = {field: amount for field, amount in increments.items() if amount}
+    if not increments:
+        return
+    day = day or timezone.localdate()
+    row = DailyActivity.objects.filter(user=user, date=day)
+    updates = {field: F(field) + amount for field, amount in increments.items()}
+
+    if row.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailyActivity.objects.create(user=user, date=day, **increments)
+    except IntegrityError:
+        # Another request created today's row first
+        row.update(**updates)
+
+
+def compute_daily_activity() -> Dict[DayKey, Dict[str, int]]:
+    """Every user's daily totals, recomputed from raw history in three grouped queries."""
+    from courses.models import QuizAttempt, TopicProgress
+
+    totals: Dict[DayKey, Dict[str, int]] = {}
+
+    def add(key, **values):
+        row = totals.setdefault(key, dict.fromkeys(COUNTERS, 0))
+        for field, value in values.items():
+            row[field] += value or 0
+
+    for user_id, day, minutes, sessions in (
+        StudySession.objects.annotate(day=TruncDate('session_date'))
+        .values('user_id', 'day')
+        .annotate(minutes=Sum('duration_minutes'), sessions=Count('id'))
+        .values_list('user_id', 'day', 'minutes', 'sessions')
+        .order_by()
+    ):
+        add((user_id, day), minutes=minutes, sessions=sessions)
+
+    for user_id, day, completed in (
+        TopicProgress.objects.filter(completed=True, completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at'))
+        .values('user_id', 'day')
+        .annotate(completed=Count('id'))
+        .values_list('user_id', 'day', 'completed')
+        .order_by()
+    ):
+        add((user_id, day), topics_completed=completed)
+
+    for user_id, day, taken in (
+        QuizAttempt.objects.annotate(day=TruncDate('completed_at'))
+        .values('user_id', 'day')
+        .annotate(taken=Count('id'))
+        .values_list('user_id', 'day', 'taken')
+        .order_by()
+    ):
+        add((user_id, day), quizzes_taken=taken)
+
+    return totals
+
+
+def rebuild_daily_activity(check_only: bool = False) -> Dict[str, int]:
+    """
+    Compare DailyActivity with raw history and, unless check_only, repair it
+    with bulk writes. Returns counts of missing, stale and orphaned rows.
+    """
+    expected = compute_daily_activity()
+    existing = {
+        (row.user_id, row.date): row
+        for row in DailyActivity.objects.all()
+    }
+
+    missing = [key for key in expected if key not in existing]
+    stale = [
+        existing[key] for key, values in expected.items()
+        if key in existing and any(getattr(existing[key], field) != value for field, value in values.items())
+    ]
+    orphaned = [row.id for key, row in existing.items() if key not in expected]
+
+    if not check_only:
+        with transaction.atomic():
+            DailyActivity.objects.filter(id__in=orphaned).delete()
+            for row in stale:
+                for field, value in expected[(row.user_id, row.date)].items():
+                    setattr(row, field, value)
+            DailyActivity.objects.bulk_update(stale, list(COUNTERS), batch_size=500)
+            DailyActivity.objects.bulk_create(
+                [DailyActivity(user_id=user_id, date=day, **expected[(user_id, day)]) for user_id, day in missing],
+                batch_size=500,
+            )
+
+    return {'missing': len(missing), 'stale': len(stale), 'orphaned': len(orphaned)}
@@ -1,3 +1,5 @@
+from datetime import timedelta
+from django.utils import timezone
 from rest_framework import serializers
 from .models import StudySession, Achievement
 
@@ -14,4 +16,18 @@ class AchievementSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Achievement
-        fields = ['id', 'achievement_type', 'achievement_name', 'earned_at']
\ No newline at end of file
+        fields = ['id', 'achievement_type', 'achievement_name', 'earned_at']
+
+class StudySessionBulkItemSerializer(serializers.Serializer):
+    """One session in a bulk upload; ids are checked against the database by the view."""
+    course_id = serializers.IntegerField()
+    topic_id = serializers.IntegerField(required=False, allow_null=True)
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=24 * 60)
+    session_date = serializers.DateTimeField(required=False)
+
+    def validate_session_date(self, value):
+        # A little slack for client clocks running ahead
+        if value > timezone.now() + timedelta(minutes=5):
+            raise serializers.ValidationError("Session date can't be in the future")
+        return value
+
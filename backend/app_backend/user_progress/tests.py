@@ -1,3 +1,117 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.models import CustomUser, UserProfile
+from courses.models import Course, Quiz, Topic
+from .achievements import SESSION_LOGGED, record_event
+from .models import Achievement, AchievementState, DailyActivity, StudySession
+
+
+class ProgressTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='alice', password='pw12345!x')
+        UserProfile.objects.create(user=self.user)
+        self.course = Course.objects.create(title='Go', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        self.topic = Topic.objects.create(course=self.course, title='T', description='d', order=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.now = timezone.now()
+
+    def streak(self):
+        return self.client.get('/api/progress/analytics/').data['current_streak']
+
+
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class BulkStudySessionTests(ProgressTestCase):
+    url = '/api/progress/log-sessions/bulk/'
+
+    def session(self, days_ago=0, **fields):
+        return {
+            'course_id': self.course.id,
+            'duration_minutes': 10,
+            'session_date': (self.now - timedelta(days=days_ago)).isoformat(),
+            **fields,
+        }
+
+    def test_reports_each_item(self):
+        other = Course.objects.create(title='Rust', description='d', difficulty='beginner', estimated_duration='4 weeks')
+        response = self.client.post(self.url, {'sessions': [
+            self.session(topic_id=self.topic.id),
+            self.session(course_id=0),
+            self.session(course_id=other.id, topic_id=self.topic.id),
+            self.session(duration_minutes=0),
+            {'course_id': self.course.id, 'duration_minutes': 5,
+             'session_date': (self.now + timedelta(days=1)).isoformat()},
+            {'course_id': self.course.id, 'duration_minutes': 5},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 4))
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results],
+                         ['created', 'error', 'error', 'error', 'error', 'created'])
+        self.assertIn('course_id', results[1]['errors'])
+        self.assertIn('topic_id', results[2]['errors'])
+        self.assertIn('duration_minutes', results[3]['errors'])
+        self.assertIn('session_date', results[4]['errors'])
+        self.assertEqual(StudySession.objects.count(), 2)
+        self.assertEqual(DailyActivity.objects.get(user=self.user).minutes, 15)
+
+    def test_rejects_bad_payloads(self):
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'sessions': 'x'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, [self.session(course_id=0)], format='json').status_code, 400)
+
+    def test_offline_days_extend_the_streak(self):
+        response = self.client.post(self.url, [self.session(days_ago) for days_ago in (2, 1, 0)], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.streak(), 3)
+
+    def test_backdated_days_after_todays_activity(self):
+        self.client.post('/api/progress/log-session/', {'course_id': self.course.id, 'duration_minutes': 5}, format='json')
+        self.assertEqual(self.streak(), 1)
+
+        self.client.post(self.url, [self.session(2), self.session(1)], format='json')
+        self.assertEqual(self.streak(), 3)
+        # A day that doesn't touch the run leaves it alone
+        self.client.post(self.url, [self.session(5)], format='json')
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual((profile.current_streak, profile.longest_streak), (3, 3))
+
+
+QUIZ = [{'id': str(i), 'question': f'q{i}', 'options': ['a', 'b'], 'correct_answer': 1, 'explanation': 'e'} for i in range(5)]
+
+
+@override_settings(COURSE_GENERATION_WORKERS=0)
+class AchievementTests(ProgressTestCase):
+    def earned(self):
+        return sorted(Achievement.objects.filter(user=self.user).values_list('achievement_type', flat=True))
+
+    def test_events_that_cannot_unlock_anything_are_free(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(record_event(self.user, SESSION_LOGGED, streak=3), [])
+
+    def test_quiz_master_and_first_course(self):
+        Quiz.objects.create(topic=self.topic, questions=QUIZ)
+        url = f'/api/courses/topic/{self.topic.id}/submit-quiz/'
+        for _ in range(9):
+            self.client.post(url, {'answers': [0] * 5}, format='json')
+        self.assertEqual(self.earned(), [])
+        self.assertEqual(AchievementState.objects.get(user=self.user).quizzes_taken, 9)
+
+        self.client.post(url, {'answers': [1] * 5}, format='json')
+        self.assertEqual(self.earned(), ['fast learner', 'first course', 'quiz master'])
+        # Earned once only
+        self.client.post(url, {'answers': [1] * 5}, format='json')
+        self.assertEqual(len(self.earned()), 3)
+
+    def test_streak_achievement_from_logged_session(self):
+        UserProfile.objects.filter(user=self.user).update(
+            current_streak=6, longest_streak=6, last_active_date=timezone.localdate() - timedelta(days=1)
+        )
+        self.client.post('/api/progress/log-session/', {'course_id': self.course.id, 'duration_minutes': 5}, format='json')
+        self.assertEqual(self.earned(), ['streak 7'])
+        response = self.client.get('/api/progress/achievements/')
+        self.assertEqual(response.status_code, 200)
 
-# Create your tests here.
@@ -3,10 +3,12 @@ from .views import (
     StudyAnalyticsAPIView,
     UserAchievementsAPIView,
     LogStudySessionAPIView,
+    LogStudySessionsBulkAPIView,
 )
 
 urlpatterns = [
     path('analytics/', StudyAnalyticsAPIView.as_view(), name='study_analytics'),
     path('achievements/', UserAchievementsAPIView.as_view(), name='user_achievements'),
     path('log-session/', LogStudySessionAPIView.as_view(), name='log_study_session'),
+    path('log-sessions/bulk/', LogStudySessionsBulkAPIView.as_view(), name='log_study_sessions_bulk'),
 ]
@@ -1,12 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
-from .models import StudySession, Achievement
-from .serializers import StudySessionSerializer, AchievementSerializer
+from .models import StudySession, Achievement, DailyActivity
+from .rollup import bump_daily_activity
+from .achievements import SESSION_LOGGED, record_event
+from .serializers import StudySessionSerializer, AchievementSerializer, StudySessionBulkItemSerializer
 from courses.models import Course, Topic
-from authentication.views import update_user_learning_streak
+from authentication.streaks import get_learning_streak, record_learning_activity, record_learning_days
+
+
+# Windows offered by StudyAnalyticsAPIView (?days=); 30 is the default
+ANALYTICS_WINDOWS = (7, 30, 90, 365)
 
 
 class StudyAnalyticsAPIView(APIView):
@@ -14,42 +21,44 @@ class StudyAnalyticsAPIView(APIView):
 
     def get(self, request):
         user = request.user
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_sessions = StudySession.objects.filter(
-            user=user, session_date__gte=thirty_days_ago
-        )
-
-        total_study_time = recent_sessions.aggregate(total=Sum('duration_minutes'))['total'] or 0
-        total_sessions = recent_sessions.count()
-
-        # Streak Calculation
-        today = timezone.now().date()
-        streak = 0
-        current_date = today
-        while True:
-            if StudySession.objects.filter(user=user, session_date__date=current_date).exists():
-                streak += 1
-                current_date -= timedelta(days=1)
-            else:
-                break
-
-        weekly_data = []
-        for i in range(7):
-            date = today - timedelta(days=i)
-            daily_time = StudySession.objects.filter(
-                user=user, session_date__date=date
-            ).aggregate(total=Sum('duration_minutes'))['total'] or 0
-
-            weekly_data.append({
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = None
+        if days not in ANALYTICS_WINDOWS:
+            return Response({'error': f"days must be one of {', '.join(map(str, ANALYTICS_WINDOWS))}"}, status=400)
+
+        today = timezone.localdate()
+        first_day = today - timedelta(days=days - 1)
+
+        # One rollup row per active day; days without activity are filled in
+        # below, so the cost depends only on the days shown
+        per_day = {
+            row['date']: row
+            for row in DailyActivity.objects.filter(user=user, date__gte=first_day, sessions__gt=0)
+            .values('date', 'minutes', 'sessions')
+        }
+
+        daily_data = []
+        for offset in range(days):
+            date = today - timedelta(days=offset)
+            row = per_day.get(date)
+            daily_data.append({
                 'date': date.strftime('%Y-%m-%d'),
-                'minutes': daily_time
+                'minutes': row['minutes'] if row else 0,
+                'sessions': row['sessions'] if row else 0,
             })
 
+        total_study_time = sum(row['minutes'] for row in per_day.values())
+        total_sessions = sum(row['sessions'] for row in per_day.values())
+
         return Response({
+            'days': days,
             'total_study_time_minutes': total_study_time,
             'total_sessions': total_sessions,
-            'current_streak': streak,
-            'weekly_data': weekly_data,
+            'current_streak': get_learning_streak(user),
+            'weekly_data': [{'date': day['date'], 'minutes': day['minutes']} for day in daily_data[:7]],
+            'daily_data': daily_data,
             'average_session_time': total_study_time / total_sessions if total_sessions > 0 else 0
         })
 
@@ -85,8 +94,9 @@ class LogStudySessionAPIView(APIView):
                 duration_minutes=duration_minutes
             )
 
-            update_user_learning_streak(request.user)
-            _check_achievements(request.user)
+            bump_daily_activity(request.user, minutes=duration_minutes, sessions=1)
+            learning_streak = record_learning_activity(request.user)
+            record_event(request.user, SESSION_LOGGED, streak=learning_streak)
 
             serializer = StudySessionSerializer(session)
             return Response(serializer.data)
@@ -97,18 +107,85 @@ class LogStudySessionAPIView(APIView):
             return Response({'error': 'Topic not found'}, status=404)
 
 
-def _check_achievements(user):
-    from courses.models import UserCourse, QuizAttempt
+# Largest batch accepted by LogStudySessionsBulkAPIView
+MAX_BULK_SESSIONS = 500
 
-    if UserCourse.objects.filter(user=user, completed=True).count() == 1:
-        Achievement.objects.get_or_create(user=user, achievement_type='First Course Completed')
 
-    if QuizAttempt.objects.filter(user=user).count() >= 10:
-        Achievement.objects.get_or_create(user=user, achievement_type='Quiz Master')
+class LogStudySessionsBulkAPIView(APIView):
+    """
+    Log many study sessions at once, e.g. when an offline client syncs.
 
-    learning_streak = update_user_learning_streak(user)
+    Items are validated individually and valid ones are saved even when
+    others fail; the response lists the outcome of each item in order.
+    Course and topic ids are checked with one query each, the sessions
+    are inserted in one transaction, and the daily rollup, streak and
+    achievements are updated once for the whole batch.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('sessions') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Expected a non-empty list of sessions'}, status=400)
+        if len(items) > MAX_BULK_SESSIONS:
+            return Response({'error': f'At most {MAX_BULK_SESSIONS} sessions per request'}, status=400)
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = StudySessionBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+        course_ids = set(Course.objects.filter(
+            id__in={data['course_id'] for _, data in valid}
+        ).values_list('id', flat=True))
+        topic_courses = dict(Topic.objects.filter(
+            id__in={data['topic_id'] for _, data in valid if data.get('topic_id')}
+        ).values_list('id', 'course_id'))
+
+        now = timezone.now()
+        sessions, indexes = [], []
+        for index, data in valid:
+            topic_id = data.get('topic_id')
+            if data['course_id'] not in course_ids:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'course_id': ['Course not found']}}
+            elif topic_id and topic_courses.get(topic_id) != data['course_id']:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'topic_id': ['Topic not found in this course']}}
+            else:
+                sessions.append(StudySession(
+                    user=request.user,
+                    course_id=data['course_id'],
+                    topic_id=topic_id or None,
+                    duration_minutes=data['duration_minutes'],
+                    session_date=data.get('session_date', now),
+                ))
+                indexes.append(index)
+
+        if sessions:
+            with transaction.atomic():
+                StudySession.objects.bulk_create(sessions)
+
+            per_day = {}
+            for session in sessions:
+                day = timezone.localdate(session.session_date)
+                minutes, count = per_day.get(day, (0, 0))
+                per_day[day] = (minutes + session.duration_minutes, count + 1)
+
+            for day, (minutes, count) in sorted(per_day.items()):
+                bump_daily_activity(request.user, day, minutes=minutes, sessions=count)
+            # Days older than the last active day are folded in from the rollup
+            learning_streak = record_learning_days(request.user, per_day)
+            record_event(request.user, SESSION_LOGGED, count=len(sessions), streak=learning_streak)
+
+        for index, session in zip(indexes, sessions):
+            results[index] = {'index': index, 'status': 'created', 'id': session.id}
+
+        return Response({
+            'created': len(sessions),
+            'failed': len(items) - len(sessions),
+            'results': results,
+        }, status=201 if sessions else 400)
 
-    if learning_streak >= 7:
-        Achievement.objects.get_or_create(user=user, achievement_type='7 Day Streak')
-    if learning_streak >= 30:
-        Achievement.objects.get_or_create(user=user, achievement_type='30 Day Streak')
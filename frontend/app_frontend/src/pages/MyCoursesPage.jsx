@@ -11,9 +11,28 @@ const formatStudyTime = (minutes) => {
   return `${hours}h`;
 };
 
+const transformCourse = (userCourse) => ({
+  id: userCourse.course.id,
+  name: userCourse.course.title,
+  progress: userCourse.progress_percentage,
+  totalTopics: userCourse.course.topics?.length || 0,
+  completedTopics: Math.round(
+    (userCourse.progress_percentage / 100) *
+      (userCourse.course.topics?.length || 0)
+  ),
+  lastAccessed: new Date(userCourse.enrolled_at).toISOString().split("T")[0],
+  difficulty: userCourse.course.difficulty,
+  estimatedTime: userCourse.course.estimated_duration,
+  completed: userCourse.completed,
+  enrolledAt: userCourse.enrolled_at,
+  studyTimeMinutes: userCourse.study_time_minutes || 0,
+});
+
 export default function MyCoursesPage() {
   const [enrolledCourses, setEnrolledCourses] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const [overallStats, setOverallStats] = useState({
     totalCourses: 0,
@@ -31,24 +50,8 @@ export default function MyCoursesPage() {
           apiService.getUserStats(),
         ]);
 
-        const transformedCourses = coursesData.map((userCourse) => ({
-          id: userCourse.course.id,
-          name: userCourse.course.title,
-          progress: userCourse.progress_percentage,
-          totalTopics: userCourse.course.topics?.length || 0,
-          completedTopics: Math.round(
-            (userCourse.progress_percentage / 100) *
-              (userCourse.course.topics?.length || 0)
-          ),
-          lastAccessed: new Date(userCourse.enrolled_at)
-            .toISOString()
-            .split("T")[0],
-          difficulty: userCourse.course.difficulty,
-          estimatedTime: userCourse.course.estimated_duration,
-          completed: userCourse.completed,
-          enrolledAt: userCourse.enrolled_at,
-          studyTimeMinutes: userCourse.study_time_minutes || 0,
-        }));
+        const transformedCourses = coursesData.results.map(transformCourse);
+        setNextPage(coursesData.next);
 
         setEnrolledCourses(transformedCourses);
 
@@ -85,6 +88,23 @@ export default function MyCoursesPage() {
     loadData();
   }, []);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    setIsLoadingMore(true);
+    try {
+      const coursesData = await apiService.getMyCourses(nextPage);
+      setEnrolledCourses((courses) => [
+        ...courses,
+        ...coursesData.results.map(transformCourse),
+      ]);
+      setNextPage(coursesData.next);
+    } catch (error) {
+      console.error("Error loading more courses:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-gray-900 px-4 sm:px-6 lg:px-12 py-8">
       {/* Header */}
@@ -233,6 +253,17 @@ export default function MyCoursesPage() {
                 </Link>
               </motion.div>
             ))}
+            {nextPage && (
+              <div className="text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={isLoadingMore}
+                  className="bg-gray-700 hover:bg-gray-600 disabled:opacity-50 text-white px-6 py-2 rounded-lg font-medium transition-colors"
+                >
+                  {isLoadingMore ? "Loading..." : "Load more courses"}
+                </button>
+              </div>
+            )}
           </div>
         ) : (
           <motion.div
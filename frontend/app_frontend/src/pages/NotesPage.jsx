@@ -15,8 +15,8 @@ export default function NotesPage() {
     const generateNotes = async () => {
       setIsLoading(true);
       try {
-        const response = await apiService.getTopicNotes(topicId);
-        setNotes(response.notes || "");
+        const notesText = await apiService.getTopicNotesText(topicId);
+        setNotes(notesText || "");
         await apiService.logStudySession(courseId, topicId, 15);
       } catch (error) {
         console.error("Error loading notes:", error);
@@ -9,8 +9,8 @@ import { motion, AnimatePresence } from 'framer-motion';
  * @property {string} id
  * @property {string} question
  * @property {string[]} options
- * @property {number} correctAnswer
- * @property {string} explanation
+ * @property {number|null} correctAnswer - known once the quiz is submitted
+ * @property {string} explanation - known once the quiz is submitted
  */
 
 // Animation variants
@@ -78,12 +78,13 @@ export default function QuizPage() {
       try {
         const response = await apiService.getTopicQuiz(topicId);
         console.log("Quiz API response:", response);
+        // Answers and explanations are only sent back after submission
         const quizQuestions = response.questions.map((q) => ({
           id: q.id,
           question: q.question,
           options: q.options,
-          correctAnswer: q.correct_answer,
-          explanation: q.explanation
+          correctAnswer: null,
+          explanation: ''
         }));
         
         setQuestions(quizQuestions);
@@ -184,6 +185,15 @@ export default function QuizPage() {
     try {
       const response = await apiService.submitQuiz(topicId, selectedAnswers);
       console.log('Quiz submitted:', response);
+      if (response.results) {
+        setQuestions((current) =>
+          current.map((q, index) => ({
+            ...q,
+            correctAnswer: response.results[index]?.correct_answer ?? q.correctAnswer,
+            explanation: response.results[index]?.explanation ?? q.explanation
+          }))
+        );
+      }
       
       // Log study session for quiz
       await apiService.logStudySession(courseId, topicId, 20);
@@ -153,9 +153,27 @@ class ApiService {
         duration_weeks: duration_weeks
       })
     });
+    const data = await this.handleResponse(response);
+    if (response.status !== 202) return data;
+    return this.waitForGenerationJob(data.job.id);
+  }
+
+  async getGenerationJob(jobId) {
+    const response = await fetch(`${API_BASE_URL}/courses/generate/${jobId}/`, {
+      headers: this.getAuthHeaders()
+    });
     return this.handleResponse(response);
   }
 
+  async waitForGenerationJob(jobId, intervalMs = 2000) {
+    while (true) {
+      const job = await this.getGenerationJob(jobId);
+      if (job.status === 'completed') return job;
+      if (job.status === 'failed') throw new Error(job.error || job.message);
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  }
+
   async getCourse(courseId) {
     const response = await fetch(`${API_BASE_URL}/courses/${courseId}/`, {
       headers: this.getAuthHeaders()
@@ -170,6 +188,17 @@ class ApiService {
     return this.handleResponse(response);
   }
 
+  // Plain Markdown; the browser decodes the stored gzip bytes transparently
+  async getTopicNotesText(topicId) {
+    const response = await fetch(`${API_BASE_URL}/courses/topic/${topicId}/notes/raw/`, {
+      headers: this.getAuthHeaders()
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return response.text();
+  }
+
   async getTopicQuiz(topicId) {
     const response = await fetch(`${API_BASE_URL}/courses/topic/${topicId}/quiz/`, {
       headers: this.getAuthHeaders()
@@ -186,22 +215,32 @@ class ApiService {
     return this.handleResponse(response);
   }
 
-  async getMyCourses() {
-    const response = await fetch(`${API_BASE_URL}/courses/my-courses/`, {
+  async searchCourses(query, page = 1) {
+    const params = new URLSearchParams({ q: query, page });
+    const response = await fetch(`${API_BASE_URL}/courses/search/?${params}`, {
+      headers: this.getAuthHeaders()
+    });
+    return this.handleResponse(response);
+  }
+
+  // Listings are cursor-paginated: pass the previous page's `next` URL to continue
+  async getMyCourses(pageUrl = null) {
+    const response = await fetch(pageUrl || `${API_BASE_URL}/courses/my-courses/`, {
       headers: this.getAuthHeaders()
     });
     return this.handleResponse(response);
   }
 
-  async getFeaturedCourses() {
-    const response = await fetch(`${API_BASE_URL}/courses/featured/`, {
+  async getFeaturedCourses(pageUrl = null) {
+    const response = await fetch(pageUrl || `${API_BASE_URL}/courses/featured/`, {
       headers: this.getAuthHeaders()
     });
     return this.handleResponse(response);
   }
 
-  async getStudyAnalytics() {
-    const response = await fetch(`${API_BASE_URL}/progress/analytics/`, {
+  // days: 7, 30, 90 or 365
+  async getStudyAnalytics(days = 30) {
+    const response = await fetch(`${API_BASE_URL}/progress/analytics/?days=${days}`, {
       headers: this.getAuthHeaders()
     });
     return this.handleResponse(response);
@@ -226,6 +265,16 @@ class ApiService {
     });
     return this.handleResponse(response);
   }
+
+  // sessions: [{ course_id, topic_id, duration_minutes, session_date }], e.g. queued while offline
+  async logStudySessionsBulk(sessions) {
+    const response = await fetch(`${API_BASE_URL}/progress/log-sessions/bulk/`, {
+      method: 'POST',
+      headers: this.getAuthHeaders(),
+      body: JSON.stringify({ sessions })
+    });
+    return this.handleResponse(response);
+  }
 }
 
 export const apiService = new ApiService();